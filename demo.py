@@ -2,17 +2,21 @@ import sys
 import os
 import json
 import time
-import matplotlib.pyplot as plt
-from geotoolkit.io import read_geojson, write_geojson, write_csv
+import subprocess
+import numpy as np
+# NOTE: matplotlib / geotoolkit.viz / geotoolkit.raster are imported lazily
+# inside the tasks that need them, so picking a non-plotting task doesn't
+# pay their (matplotlib backend, rasterio/GDAL) import cost at startup.
+from geotoolkit.io import read_geojson, write_geojson, write_geojson_seq, write_csv, index_by_type
 from geotoolkit.project import to_epsg
 from geotoolkit.analysis import (
-    buffer, clip, nearest,
-    get_area, get_length, is_contained,
-    nearest_optimized,
-    get_bbox, get_centroid, get_envelope
+    buffer, clip, nearest, nearest_bulk,
+    get_area, get_length, is_contained, contains_points,
+    nearest_optimized, SpatialIndex,
+    get_bbox, get_centroid, get_envelope,
+    get_centroids, get_envelopes
 )
 
-from geotoolkit.viz import plot_features
 # [NEW] Import the new radius filter function
 from geotoolkit.query import tag_points_within, filter_points_within, filter_points_by_distance
 from geotoolkit.knn import knn_points
@@ -26,12 +30,11 @@ except ImportError:
     HAS_CITIES = False
     WORLD_CITIES = {}
 
-# [NEW] Import raster module safely
+# orjson parses JSON several times faster than the stdlib; optional
 try:
-    from geotoolkit.raster import sample_raster_at_points, generate_synthetic_raster
-    HAS_RASTERIO = True
+    import orjson
 except ImportError:
-    HAS_RASTERIO = False
+    orjson = None
 
 
 # ==========================================
@@ -49,9 +52,24 @@ try:
     # Project data to a metric system (EPSG:3857) so we can calculate distances in meters
     fc_m = to_epsg(fc, 4326, 3857)
     
+    # Group features by geometry type once, so tasks get O(1) access
+    # instead of re-scanning the whole collection every time
+    fc_by_type = index_by_type(fc_m)
+
     # Extract the main Polygon and Point geometry for use in tasks
-    poly = [f for f in fc_m["features"] if f["geometry"]["type"] == "Polygon"][0]["geometry"]
-    pt = [f for f in fc_m["features"] if f["geometry"]["type"] == "Point"][0]["geometry"]
+    poly = fc_by_type["Polygon"][0]["geometry"]
+    pt = fc_by_type["Point"][0]["geometry"]
+
+    # Build the spatial index over the whole collection once; every task
+    # that needs indexed queries shares it instead of rebuilding the tree
+    spatial_index = SpatialIndex(fc_m)
+
+    # SoA layout: all point coordinates of fc_m as one contiguous (N, 2)
+    # array, so vectorized distance/contains checks never chase dicts
+    pts_xy = np.array(
+        [f["geometry"]["coordinates"] for f in fc_by_type["Point"]],
+        dtype=np.float64,
+    ).reshape(-1, 2)
     print("Data loading and transformation complete.")
 except Exception as e:
     # Exit if data loading fails (critical error)
@@ -62,6 +80,107 @@ except Exception as e:
 # 2. Helper Functions
 # ==========================================
 
+from functools import lru_cache
+
+@lru_cache(maxsize=32)
+def buffer_poly_cached(dist):
+    """
+    Buffer of the global `poly`, memoized per distance.
+
+    Several tasks independently recompute buffer(poly, 500); since poly is
+    fixed for the session, caching by distance makes the expensive GEOS
+    offset run only once per distinct distance.
+    """
+    return buffer(poly, dist)
+
+
+# Parsed-JSON cache keyed by path; entries are revalidated against the
+# file's mtime so stale results are never served after a task rewrites one
+_json_cache = {}
+
+def load_json_cached(path):
+    """
+    Read and parse a JSON file, caching the parsed dict per path.
+
+    task_viz and task_report re-read the same out/*.geojson files on every
+    invocation; parsing them once per modification (with orjson when
+    installed) removes that repeated tokenizer cost.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _json_cache[path] = (mtime, data)
+    return data
+
+
+def save_result(obj, path):
+    """
+    Write a task output and seed the parse cache with the in-memory object.
+
+    When tasks are chained in one session (e.g. 1 then 5), the consumer
+    gets the dict that was just produced instead of re-reading and
+    re-parsing the file it was serialized to.
+    """
+    write_geojson(obj, path)
+    _json_cache[path] = (os.stat(path).st_mtime_ns, obj)
+
+
+# SoA coordinate arrays derived from cached point files, keyed by the
+# identity of the parsed feature list (stable until the file changes)
+_pts_xy_cache = {}
+
+def load_points(path):
+    """
+    Load a point FeatureCollection plus its (N, 2) coordinate array.
+
+    task_batch, task_geometry_summary and task_knn all read
+    data/generated_points.geojson; this shares one parse (via the JSON
+    cache) and one coordinate extraction across them.
+    """
+    fc = load_json_cached(path)
+    feats = fc.get("features", [])
+    hit = _pts_xy_cache.get(path)
+    if hit is None or hit[0] is not feats:
+        xy = np.array(
+            [f["geometry"]["coordinates"] for f in feats if f["geometry"]["type"] == "Point"],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        _pts_xy_cache[path] = hit = (feats, xy)
+    return fc, hit[1]
+
+
+def _existing_outputs():
+    """
+    Snapshot of the files currently in out/, as "out/<name>" paths.
+
+    One scandir replaces the half-dozen per-path os.path.exists stats that
+    task_viz and task_report issue while deciding which results to link.
+    """
+    try:
+        return {"out/" + e.name for e in os.scandir("out")}
+    except FileNotFoundError:
+        return set()
+
+
+def _open_file_async(path):
+    """
+    Hand a result file to the OS default viewer without blocking the menu.
+
+    os.startfile can stall while file associations resolve; a detached
+    "cmd /c start" returns immediately. No-op on other platforms.
+    """
+    if sys.platform != "win32":
+        return
+    try:
+        subprocess.Popen(["cmd", "/c", "start", "", os.path.abspath(path)], close_fds=True)
+    except Exception:
+        pass
+
+
 def convert_cities_to_geojson(cities_dict):
     """
     Helper: Convert the dictionary {'Name': (lat, lon)} to a GeoJSON FeatureCollection.
@@ -88,15 +207,30 @@ def task_buffer():
     
     # Simple interaction: allow user to input distance
     user_dist = input("Enter buffer distance (meters, default 500): ").strip()
-    # Validate input: use 500 if input is not a number
-    dist = float(user_dist) if user_dist.isdigit() else 500
-    
-    # Perform buffer calculation
-    buf = buffer(poly, dist)
+    # Validate input: accept any numeric value (including decimals like
+    # "250.5", which isdigit() would wrongly bounce to the default)
+    try:
+        dist = float(user_dist) if user_dist else 500.0
+    except ValueError:
+        dist = 500.0
     
-    # Save result to file
-    write_geojson(buf, "out/buffer_500m.geojson")
-    print(f" -> Generated {dist}m buffer, saved to out/buffer_500m.geojson")
+    # Perform buffer calculation (cached across tasks per distance)
+    buf = buffer_poly_cached(dist)
+
+    # Skip the rewrite when the file on disk already holds exactly this
+    # result (same object seeded into the cache, file untouched since)
+    out_path = "out/buffer_500m.geojson"
+    cached = _json_cache.get(out_path)
+    try:
+        fresh = cached is not None and cached[1] is buf \
+            and cached[0] == os.stat(out_path).st_mtime_ns
+    except OSError:
+        fresh = False
+    if fresh:
+        print(f" -> {dist}m buffer unchanged, kept existing {out_path}")
+    else:
+        save_result(buf, out_path)
+        print(f" -> Generated {dist}m buffer, saved to {out_path}")
     
     # Display the area of the new buffer
     print(f" -> Buffer Area: {get_area(buf):.2f} sq. meters")
@@ -106,14 +240,14 @@ def task_clip():
     """Task 2: Clip Features"""
     print("\n>>> Executing [2] Clip Operation...")
     
-    # Generate a temporary 500m buffer to use as the "cookie cutter"
-    clipper = buffer(poly, 500) 
+    # Reuse the session-cached 500m buffer as the "cookie cutter"
+    clipper = buffer_poly_cached(500)
     
     # Clip the original features using the clipper
     clipped = clip(fc_m, clipper)
     
     # Save clipped results
-    write_geojson(clipped, "out/clipped_features.geojson")
+    save_result(clipped, "out/clipped_features.geojson")
     print(" -> Clipping complete, result saved to out/clipped_features.geojson")
 
 def task_nearest():
@@ -131,7 +265,7 @@ def task_analysis():
     print("\n>>> Executing [4] Geometric Attribute Analysis...")
     
     # Create temporary geometry for analysis
-    temp_buf = buffer(poly, 500)
+    temp_buf = buffer_poly_cached(500)
     
     # Calculate perimeter
     perimeter = get_length(temp_buf)
@@ -150,16 +284,16 @@ def task_optimized_search():
     # 1. Standard Search (Benchmark)
     print(" -> Running standard search (for comparison)...")
     t_start = time.time()
-    # Simulating a heavier load by looping through features manually
-    for f in fc_m["features"]:
-        nearest(pt, f["geometry"])
+    # Brute force reference: exact distance to every feature, but in one
+    # vectorized pass instead of a Python-level loop per feature
+    spatial_index.nearest_bruteforce(pt)
     t_std = time.time() - t_start
     
     # 2. Optimized Search
     print(" -> Running STRtree optimized search...")
     t_start = time.time()
-    # Build tree and search
-    dist, geom = nearest_optimized(pt, fc_m)
+    # Query the tree that was built once at init
+    dist, geom = spatial_index.nearest(pt)
     t_opt = time.time() - t_start
     
     print(f" -> Found nearest distance: {dist:.2f} meters")
@@ -171,33 +305,26 @@ def task_geo_features():
     """Task 8: Extract Centroids & Envelopes"""
     print("\n>>> Executing [8] Extracting Geometric Features...")
     
-    geo_features = []
-    
-    # Loop through all polygons in the dataset
-    polygons = [f for f in fc_m["features"] if f["geometry"]["type"] == "Polygon"]
-    
+    # All polygons, straight from the type index built at init
+    polygons = fc_by_type["Polygon"]
+
     print(f" -> Processing {len(polygons)} polygons...")
-    
-    for poly_feat in polygons:
-        geom = poly_feat["geometry"]
-        
-        # 1. Get Centroid
-        cent = get_centroid(geom)
-        geo_features.append({
-            "type": "Feature",
-            "properties": {"type": "Centroid"},
-            "geometry": cent
-        })
-        
-        # 2. Get Envelope (Bounding Box)
-        env = get_envelope(geom)
-        geo_features.append({
-            "type": "Feature",
-            "properties": {"type": "Envelope"},
-            "geometry": env
-        })
-        
-    write_geojson({"type": "FeatureCollection", "features": geo_features}, "out/geo_features.geojson")
+
+    # Batch both derivations: one vectorized GEOS call for all centroids
+    # and one for all envelopes, then flatten into features in the
+    # original order (centroid then envelope per polygon)
+    polys_fc = {"type": "FeatureCollection", "features": polygons}
+    geo_features = [
+        feat
+        for cent, env in zip(get_centroids(polys_fc), get_envelopes(polys_fc))
+        for feat in (
+            {"type": "Feature", "properties": {"type": "Centroid"}, "geometry": cent},
+            {"type": "Feature", "properties": {"type": "Envelope"}, "geometry": env},
+        )
+    ]
+
+
+    save_result({"type": "FeatureCollection", "features": geo_features}, "out/geo_features.geojson")
     print(" -> Saved Centroids and Envelopes to out/geo_features.geojson")
 
 
@@ -216,50 +343,56 @@ def task_viz():
     path_sampled = "out/sampled_points.geojson"
     # [NEW] Path for Spatial Query Result (Task 13)
     path_query = "out/query_radius_result.geojson"
-    
+
+    # One directory scan answers every "does this result exist?" check below
+    present = _existing_outputs()
+
     # --- Layer 1: Base Map (Result of Task 1 or 2 or 13) ---
     has_processed_data = False
     
     # Priority 0: Spatial Query Results (Task 13) - Highest Priority for Viz
-    if os.path.exists(path_query):
+    if path_query in present:
         print(f" -> [Display] Detected Spatial Query result: {path_query}")
         try:
-            with open(path_query, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: 
-                    # Tag them as sampled/special for blue color
-                    for ft in data["features"]:
-                         # We use existing visualization logic for blue points
-                         ft["properties"]["_viz_type"] = "SampledPoint" 
-                         # Use distance as the value to display
-                         ft["properties"]["raster_value"] = ft["properties"].get("distance_to_center", 0)
-                    viz_features.extend(data["features"])
-                title_parts.append("Spatial Query")
-                has_processed_data = True
+            data = load_json_cached(path_query)
+            if "features" in data:
+                # Tag copies as sampled/special for blue color: the cached
+                # dict is shared with task 6, so the viz-only props must not
+                # be written onto the cached features themselves
+                viz_features.extend(
+                    {**ft, "properties": {
+                        **ft["properties"],
+                        # We use existing visualization logic for blue points
+                        "_viz_type": "SampledPoint",
+                        # Use distance as the value to display
+                        "raster_value": ft["properties"].get("distance_to_center", 0),
+                    }}
+                    for ft in data["features"]
+                )
+            title_parts.append("Spatial Query")
+            has_processed_data = True
         except Exception: pass
 
     # Priority 1: Clipped Results (Only if Query not shown)
-    if os.path.exists(path_clip) and not has_processed_data:
+    if path_clip in present and not has_processed_data:
         print(f" -> [Display] Detected clip result: {path_clip}")
         try:
-            with open(path_clip, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: viz_features.extend(data["features"])
-                title_parts.append("Clipped")
-                has_processed_data = True
+            data = load_json_cached(path_clip)
+            if "features" in data: viz_features.extend(data["features"])
+            title_parts.append("Clipped")
+            has_processed_data = True
         except Exception: pass
 
     # Priority 2: Buffer Results (if no clip/query)
-    elif os.path.exists(path_buf):
+    elif path_buf in present:
         print(f" -> [Display] Detected buffer file: {path_buf}")
         try:
-            with open(path_buf, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: viz_features.extend(data["features"])
-                elif "type" in data and data["type"] == "Polygon":
-                     viz_features.append({"type": "Feature", "properties": {"type": "Buffer"}, "geometry": data})
-                title_parts.append("Buffer")
-                has_processed_data = True
+            data = load_json_cached(path_buf)
+            if "features" in data: viz_features.extend(data["features"])
+            elif "type" in data and data["type"] == "Polygon":
+                 viz_features.append({"type": "Feature", "properties": {"type": "Buffer"}, "geometry": data})
+            title_parts.append("Buffer")
+            has_processed_data = True
         except Exception: pass
 
     else:
@@ -268,73 +401,70 @@ def task_viz():
             print(" -> No processing results found, displaying original data...")
             viz_features.extend(fc_m["features"])
             title_parts.append("Original Data")
-        elif os.path.exists(path_query):
+        elif path_query in present:
              # If showing query results, add original polygons for context
-             viz_features.extend([f for f in fc_m["features"] if f["geometry"]["type"] == "Polygon"])
+             viz_features.extend(fc_by_type["Polygon"])
 
     # --- Layer 2: Geometric Features (Result of Task 8) ---
     # This acts as an overlay regardless of what base map is shown
-    if os.path.exists(path_geo):
+    if path_geo in present:
         print(f" -> [Linkage] Detected geometric features (Centroids/Envelopes)")
         try:
-            with open(path_geo, 'r', encoding='utf-8') as f:
-                geo_data = json.load(f)
-                if "features" in geo_data:
-                    viz_features.extend(geo_data["features"])
-                title_parts.append("+ Geometry")
+            geo_data = load_json_cached(path_geo)
+            if "features" in geo_data:
+                viz_features.extend(geo_data["features"])
+            title_parts.append("+ Geometry")
         except Exception: pass
         
     # [NEW] --- Layer 3: Raster Sampled Points (Result of Task 12) ---
     # Only show if we aren't already showing the Query Results (to avoid clutter)
-    if os.path.exists(path_sampled) and not os.path.exists(path_query):
+    if path_sampled in present and not path_query in present:
         print(f" -> [Linkage] Detected Raster Sampled Points")
         try:
-            with open(path_sampled, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: 
-                    # Add specific tag so viz.py knows to label values
-                    for ft in data["features"]:
-                        ft["properties"]["_viz_type"] = "SampledPoint"
-                    viz_features.extend(data["features"])
-                title_parts.append("+ Raster Values")
+            data = load_json_cached(path_sampled)
+            if "features" in data:
+                # Add specific tag (on copies - the cache is shared) so
+                # viz.py knows to label values
+                viz_features.extend(
+                    {**ft, "properties": {**ft["properties"], "_viz_type": "SampledPoint"}}
+                    for ft in data["features"]
+                )
+            title_parts.append("+ Raster Values")
         except Exception: pass
-    elif has_processed_data and not os.path.exists(path_query):
+    elif has_processed_data and not path_query in present:
          # Only show original points if we are NOT showing sampled points or query points
-         points = [f for f in fc_m["features"] if f["geometry"]["type"] == "Point"]
-         viz_features.extend(points)
+         viz_features.extend(fc_by_type["Point"])
 
     # --- Context Layers ---
     # Always add original Polygon outline for reference if we are showing Buffer/Clip
     if has_processed_data:
         viz_features.append({"type": "Feature", "geometry": poly, "properties": {"type": "Original"}})
 
-    # Plot
+    # Plot (lazy import keeps matplotlib out of non-plotting sessions)
+    from geotoolkit.viz import plot_features
+
     final_title = " / ".join(title_parts)
     output_file = "out/visualization_result.png"
     try:
         plot_features({"type": "FeatureCollection", "features": viz_features}, title=final_title, output_path=output_file)
-        if sys.platform == "win32": os.startfile(os.path.abspath(output_file))
+        _open_file_async(output_file)
     except Exception as e:
         print(f" [Error] Plotting failed: {e}")
+    finally:
+        # Drop any figure left open (e.g. after a mid-plot error) so
+        # repeated task 5 runs keep memory bounded
+        import matplotlib.pyplot as plt
+        plt.close("all")
 
 def task_batch():
-    import inspect
-    import geotoolkit.query as q
-
-    print("DEBUG demo.py path:", __file__)
-    print("DEBUG query.py path:", q.__file__)
-    print("DEBUG filter_points_within signature:", inspect.signature(q.filter_points_within))
-    print("DEBUG tag_points_within signature:", inspect.signature(q.tag_points_within))
-
     """Task 7: Batch Query on generated_points.geojson (baseline vs indexed)"""
     print("\n>>> Executing [7] Batch Query on generated_points.geojson ...")
 
     # 1) load data
-    pts_fc = read_geojson("data/generated_points.geojson")  # already EPSG:3857
-    pts_m = pts_fc
+    pts_m, _ = load_points("data/generated_points.geojson")  # already EPSG:3857
 
     # 2) reference buffer (EPSG:3857)
-    buf_geom = buffer(poly, 500)
+    buf_geom = buffer_poly_cached(500)
 
     # 3) baseline
     t0 = time.perf_counter()
@@ -353,8 +483,12 @@ def task_batch():
     print(f" -> inside buffer points: {len(inside_idx['features'])} / {len(pts_m['features'])}")
 
     # 6) save outputs
-    write_geojson(tagged_idx, "out/generated_points_tagged.geojson")
+    # the tagged dump is machine-consumed; skip the indentation pass
+    write_geojson(tagged_idx, "out/generated_points_tagged.geojson", pretty=False)
     write_geojson(inside_idx, "out/generated_points_inside_buffer.geojson")
+    # Line-delimited sibling of the big tagged output: post-processing can
+    # stream it feature-by-feature instead of parsing one monolithic JSON
+    write_geojson_seq(tagged_idx, "out/generated_points_tagged.geojsonl")
 
 
     # 7) visualize inside points + context polygon/buffer
@@ -363,6 +497,8 @@ def task_batch():
     viz_feats.append({"type": "Feature", "geometry": poly, "properties": {"type": "Original"}})
     viz_feats.append({"type": "Feature", "geometry": buf_geom, "properties": {"type": "Buffer"}})
 
+    from geotoolkit.viz import plot_features
+
     out_png = "out/generated_points_inside_buffer.png"
     plot_features(
         {"type": "FeatureCollection", "features": viz_feats},
@@ -370,11 +506,7 @@ def task_batch():
         output_path=out_png,
     )
 
-    if sys.platform == "win32":
-        try:
-            os.startfile(os.path.abspath(out_png))
-        except Exception:
-            pass
+    _open_file_async(out_png)
 
 def task_geometry_summary():
     print("\n>>> Executing [8] Geometry Summary Report ...")
@@ -398,7 +530,7 @@ def task_geometry_summary():
     })
 
     # --- Buffer Polygon ---
-    buf = buffer(poly, 500)
+    buf = buffer_poly_cached(500)
     bbox = get_bbox(buf)
     centroid = get_centroid(buf)
     rows.append({
@@ -415,25 +547,24 @@ def task_geometry_summary():
     })
 
     # --- Generated Points (as a set) ---
-    pts_m = read_geojson("data/generated_points.geojson")  
-    pts = [f["geometry"] for f in pts_m["features"] if f["geometry"]["type"] == "Point"]
-    pts_geom = {
-        "type": "MultiPoint",
-        "coordinates": [p["coordinates"] for p in pts]
-    }
+    pts_m, gen_xy = load_points("data/generated_points.geojson")
 
-    bbox = get_bbox(pts_geom)
-    centroid = get_centroid(pts_geom)
+    # bbox and centroid of a point set are plain NumPy reductions over the
+    # coordinate array - no need to assemble a MultiPoint and round-trip
+    # through GEOS (the mean of the points IS the MultiPoint centroid)
+    minx, miny = gen_xy.min(axis=0)
+    maxx, maxy = gen_xy.max(axis=0)
+    cx, cy = gen_xy.mean(axis=0)
 
     rows.append({
         "name": "generated_points",
         "geom_type": "PointCollection",
-        "minx": bbox[0],
-        "miny": bbox[1],
-        "maxx": bbox[2],
-        "maxy": bbox[3],
-        "centroid_x": centroid["coordinates"][0],
-        "centroid_y": centroid["coordinates"][1],
+        "minx": float(minx),
+        "miny": float(miny),
+        "maxx": float(maxx),
+        "maxy": float(maxy),
+        "centroid_x": float(cx),
+        "centroid_y": float(cy),
         "area": None,
         "length": None,
     })
@@ -443,25 +574,20 @@ def task_geometry_summary():
     write_csv(rows, out_csv)
     print(f" -> Geometry summary saved to {out_csv}")
 
-    if sys.platform == "win32":
-        try:
-            os.startfile(os.path.abspath(out_csv))
-        except Exception:
-            pass
+    _open_file_async(out_csv)
 
 def task_knn():
     """Task 9: KNN - find K nearest points from generated_points to the target point in sample.geojson"""
     print("\n>>> Executing [9] KNN Query on generated_points.geojson ...")
 
-    # load generated points (already EPSG:3857)
-    pts_fc = read_geojson("data/generated_points.geojson")
-    pts_m = pts_fc
+    # load generated points (already EPSG:3857), shared with tasks 7/8
+    pts_m, _ = load_points("data/generated_points.geojson")
 
     # choose target point: the point from sample.geojson (already projected in init stage)
     target_pt = pt
 
     # reference buffer for visualization context
-    buf_geom = buffer(poly, 500)
+    buf_geom = buffer_poly_cached(500)
 
     # read k from user
     user_k = input("Enter k (default 10): ").strip()
@@ -491,11 +617,7 @@ def task_knn():
     plot_knn(poly, buf_geom, target_pt, topk_fc, out_png)
 
     # auto-open on Windows
-    if sys.platform == "win32":
-        try:
-            os.startfile(os.path.abspath(out_png))
-        except Exception:
-            pass
+    _open_file_async(out_png)
 
 
 def plot_knn(poly_geom, buf_geom, target_pt_geom, points_fc, output_path):
@@ -506,9 +628,13 @@ def plot_knn(poly_geom, buf_geom, target_pt_geom, points_fc, output_path):
     - target point highlighted
     - top-k points highlighted
     """
+    import matplotlib.pyplot as plt
+
     poly_s = shape(poly_geom)
     buf_s = shape(buf_geom)
-    tgt_s = shape(target_pt_geom)
+    # Target coordinates are plain floats in the dict already; no need to
+    # wrap them in a GEOS object just to read them back
+    tgt_x, tgt_y = target_pt_geom["coordinates"][:2]
 
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_title("KNN Top-K Points to Target", fontsize=14, fontweight="bold")
@@ -523,17 +649,15 @@ def plot_knn(poly_geom, buf_geom, target_pt_geom, points_fc, output_path):
         x, y = buf_s.exterior.xy
         ax.plot(x, y, linewidth=1.0, linestyle="--")
 
-    # plot top-k points
-    xs = []
-    ys = []
-    for ft in points_fc.get("features", []):
-        p = shape(ft["geometry"])
-        xs.append(p.x)
-        ys.append(p.y)
-    ax.scatter(xs, ys, s=30, marker="o")  # top-k points
+    # plot top-k points: scatter takes the raw coordinate array directly
+    coords = np.array(
+        [ft["geometry"]["coordinates"] for ft in points_fc.get("features", [])],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    ax.scatter(coords[:, 0], coords[:, 1], s=30, marker="o")  # top-k points
 
     # plot target point (bigger + different marker)
-    ax.scatter([tgt_s.x], [tgt_s.y], s=120, marker="x")
+    ax.scatter([tgt_x], [tgt_y], s=120, marker="x")
 
     ax.set_aspect("equal")
     ax.grid(True, linestyle="--", alpha=0.5)
@@ -547,7 +671,9 @@ def plot_knn(poly_geom, buf_geom, target_pt_geom, points_fc, output_path):
 def task_raster_sampling():
     """Task 12: Raster Point Sampling (New Feature)"""
     print("\n>>> Executing [12] Raster Point Sampling...")
-    if not HAS_RASTERIO:
+    try:
+        from geotoolkit.raster import sample_raster_at_points, generate_synthetic_raster
+    except ImportError:
         print(" [Error] 'rasterio' is not installed. Please run: pip install rasterio")
         return
 
@@ -558,12 +684,13 @@ def task_raster_sampling():
         print(f" -> Raster not found at {raster_path}")
         print(" -> Generating synthetic DEM based on sample data extent...")
         
-        # Get extent of the entire dataset
-        polys = [shape(f["geometry"]) for f in fc_m["features"]]
-        minx = min(p.bounds[0] for p in polys)
-        miny = min(p.bounds[1] for p in polys)
-        maxx = max(p.bounds[2] for p in polys)
-        maxy = max(p.bounds[3] for p in polys)
+        # Get extent of the entire dataset (bbox helper, no per-feature
+        # Shapely object construction)
+        boxes = [get_bbox(f["geometry"]) for f in fc_m["features"]]
+        minx = min(b[0] for b in boxes)
+        miny = min(b[1] for b in boxes)
+        maxx = max(b[2] for b in boxes)
+        maxy = max(b[3] for b in boxes)
         
         generate_synthetic_raster(raster_path, (minx, miny, maxx, maxy))
         
@@ -573,7 +700,7 @@ def task_raster_sampling():
     
     # 3. Save Result
     out_path = "out/sampled_points.geojson"
-    write_geojson(sampled_fc, out_path)
+    save_result(sampled_fc, out_path)
     
     # Print sample values to console
     for f in sampled_fc["features"]:
@@ -689,7 +816,7 @@ def task_spatial_query():
             
     # 6. Save Results
     out_path = "out/query_radius_result.geojson"
-    write_geojson(result_fc, out_path)
+    save_result(result_fc, out_path)
     print(f"\n -> Results saved to {out_path}")
     print(" -> (Tip: Run Task [5] to visualize or [6] to export report)")
 
@@ -707,48 +834,48 @@ def task_report():
     path_sampled = "out/sampled_points.geojson"
     # [NEW] Path for Spatial Query Result
     path_query = "out/query_radius_result.geojson"
-    
+
+    # One directory scan answers every existence check in this task
+    present = _existing_outputs()
+
     target_points = []
     data_source_desc = ""
 
     # Priority 1: Check for Spatial Query (Task 13) - Most specific analysis
-    if os.path.exists(path_query):
+    if path_query in present:
         print(f" -> [Linked] Analyzing Spatial Query Results (Radius Search)")
         try:
-             with open(path_query, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: target_points = data["features"]
+             data = load_json_cached(path_query)
+             if "features" in data: target_points = data["features"]
              data_source_desc = "Radius Search Result"
         except: pass
 
     # Priority 2: Check for Raster Sampling (Task 12)
-    elif os.path.exists(path_sampled):
+    elif path_sampled in present:
         print(f" -> [Linked] Analyzing Raster Sampled Points")
         try:
-            with open(path_sampled, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if "features" in data: target_points = data["features"]
+            data = load_json_cached(path_sampled)
+            if "features" in data: target_points = data["features"]
             data_source_desc = "Raster Sampled"
         except: pass
     
     # Priority 3: Check if Task 2 (Clip) was run.
-    elif os.path.exists(path_clip):
+    elif path_clip in present:
         print(f" -> [Linked] Detected clip result, analyzing only remaining features")
         try:
-            with open(path_clip, 'r', encoding='utf-8') as f:
-                clip_data = json.load(f)
-                if "features" in clip_data:
-                    target_points = [f for f in clip_data["features"] if f["geometry"]["type"] == "Point"]
-                data_source_desc = "Clipped Data (Task 2)"
+            clip_data = load_json_cached(path_clip)
+            if "features" in clip_data:
+                target_points = [f for f in clip_data["features"] if f["geometry"]["type"] == "Point"]
+            data_source_desc = "Clipped Data (Task 2)"
         except Exception:
             pass
     
     # Fallback: Use all points from original data
     if not target_points:
-        if not os.path.exists(path_clip):
+        if not path_clip in present:
             print(f" -> Clip result not found, analyzing all points in original data")
         data_source_desc = "Original Data (Raw)"
-        target_points = [f for f in fc_m["features"] if f["geometry"]["type"] == "Point"]
+        target_points = fc_by_type["Point"]
 
     # ==========================================
     # 2. Determine Reference Standard
@@ -757,35 +884,48 @@ def task_report():
     reference_geom = None
     ref_source_desc = ""
 
-    if os.path.exists(path_buf):
+    if path_buf in present:
         try:
-            with open(path_buf, 'r', encoding='utf-8') as f:
-                buf_data = json.load(f)
-                if "type" in buf_data and buf_data["type"] == "Polygon":
-                    reference_geom = buf_data
-                elif "features" in buf_data:
-                    reference_geom = buf_data["features"][0]["geometry"]
-                ref_source_desc = "File Read (Task 1)"
-                if not os.path.exists(path_clip):
-                    print(f" -> [Linked] Buffer file loaded as judgment standard")
+            buf_data = load_json_cached(path_buf)
+            if "type" in buf_data and buf_data["type"] == "Polygon":
+                reference_geom = buf_data
+            elif "features" in buf_data:
+                reference_geom = buf_data["features"][0]["geometry"]
+            ref_source_desc = "File Read (Task 1)"
+            if not path_clip in present:
+                print(f" -> [Linked] Buffer file loaded as judgment standard")
         except Exception:
             pass
             
     if reference_geom is None:
-        if not os.path.exists(path_buf):
+        if not path_buf in present:
             pass 
-        reference_geom = buffer(poly, 500)
+        reference_geom = buffer_poly_cached(500)
         ref_source_desc = "Default 500m"
 
     # ==========================================
     # 3. Start Calculation
     # ==========================================
     print(f" -> Analyzing {len(target_points)} points based on [{data_source_desc}]...")
-    
+
+    # SoA extraction: one contiguous coordinate array for the whole report,
+    # built once (or reused from init when analyzing the original points)
+    if target_points is fc_by_type["Point"]:
+        target_xy = pts_xy
+    else:
+        target_xy = np.array(
+            [f["geometry"]["coordinates"] for f in target_points],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+
+    # All point-to-polygon distances and all containment checks in two
+    # vectorized calls instead of calling nearest()/is_contained() per point
+    dists, _, _ = nearest_bulk(target_xy, poly) if target_points else ([], None, None)
+    inside_mask = contains_points(reference_geom, target_xy) if target_points else []
+
     for i, pt_feature in enumerate(target_points):
-        geom = pt_feature["geometry"]
-        d, _, _ = nearest(geom, poly)
-        in_buf = is_contained(reference_geom, geom)
+        d = float(dists[i])
+        in_buf = bool(inside_mask[i])
         p_name = pt_feature.get("properties", {}).get("name", f"Point_{i+1}")
         props = pt_feature.get("properties", {})
 
@@ -810,11 +950,7 @@ def task_report():
     csv_path = "out/distance_report.csv"
     write_csv(report_data, csv_path)
     
-    if sys.platform == "win32":
-        try:
-            os.startfile(os.path.abspath(csv_path))
-        except:
-            pass
+    _open_file_async(csv_path)
 
 # ==========================================
 # 4. Menu Configuration
@@ -836,20 +972,42 @@ MENU = {
     "13": ("Spatial Buffer Analysis (Radius Search) [NEW!]", task_spatial_query),
 }
 
+# Banner built once at import; the interactive loop just prints it instead
+# of re-joining the menu entries every iteration
+MENU_BANNER = "\n".join(
+    ["\n" + "=" * 40,
+     "      GeoToolkit Interactive Console",
+     "=" * 40]
+    + [f" [{key}] {desc}" for key, (desc, _) in MENU.items()]
+    + [" [0] Exit Program", "-" * 40]
+)
+
 # ==========================================
 # 5. Main Loop Logic
 # ==========================================
 
 if __name__ == "__main__":
+    # Non-interactive mode: `python demo.py 1 2 6` (or `--batch 1,2,6`)
+    # runs the listed tasks once in this process (sharing the session
+    # caches: tree, buffers, parsed files) and exits - no input() waits
+    # between tasks
+    if len(sys.argv) > 1:
+        args = sys.argv[1:]
+        if args[0] == "--batch":
+            args = ",".join(args[1:]).replace(",", " ").split()
+        for key in args:
+            if key in MENU:
+                try:
+                    MENU[key][1]()
+                except Exception as e:
+                    print(f"[Error] Execution failed: {e}")
+            else:
+                print(f"\n[Warning] Invalid ID '{key}'.")
+        sys.exit(0)
+
     while True:
-        print("\n" + "="*40)
-        print("      GeoToolkit Interactive Console")
-        print("="*40)
-        for key, (desc, _) in MENU.items():
-            print(f" [{key}] {desc}")
-        print(" [0] Exit Program")
-        print("-" * 40)
-        
+        print(MENU_BANNER)
+
         user_input = input("Enter function ID (Multi-select e.g. '1,6'): ").strip()
         
         if user_input in ['0', 'q', 'exit', 'quit']:
@@ -2,15 +2,69 @@
 # in the geo-algorithms practice notebooks (buffer, intersection, nearest).
 
 from __future__ import annotations
+import json
 import time
-from typing import Any, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import shapely
 from shapely.geometry import shape, mapping
 from shapely.ops import nearest_points
 # [NEW] Import STRtree for spatial indexing
 from shapely.strtree import STRtree
 
+# Optional: scipy's cKDTree beats the STRtree for pure point-to-point
+# nearest queries; fall back gracefully when scipy is not installed
+try:
+    from scipy.spatial import cKDTree
+    HAS_SCIPY = True
+except ImportError:
+    cKDTree = None
+    HAS_SCIPY = False
+
+# Optional: orjson serializes feature dicts to bytes 2-3x faster than the
+# stdlib json; used for the streaming clip writer when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 JsonDict = Dict[str, Any]
 
+# Cache of already-converted geometries, keyed by id() of the GeoJSON dict.
+# The demos pass the same poly/pt dicts through buffer -> clip -> nearest ->
+# get_area, and shape() construction dominates those calls; caching turns N
+# conversions of the same dict into one. The dict itself is kept in the
+# value so its id() stays valid while the entry lives. Bounded to avoid
+# unbounded growth in long sessions.
+_SHAPE_CACHE: Dict[int, Tuple[JsonDict, Any]] = {}
+_SHAPE_CACHE_MAX = 1024
+
+
+def _shape_cached(geometry: JsonDict):
+    """shape() with memoization on the identity of the GeoJSON dict."""
+    key = id(geometry)
+    entry = _SHAPE_CACHE.get(key)
+    if entry is not None and entry[0] is geometry:
+        return entry[1]
+    g = shape(geometry)
+    if len(_SHAPE_CACHE) >= _SHAPE_CACHE_MAX:
+        _SHAPE_CACHE.clear()
+    _SHAPE_CACHE[key] = (geometry, g)
+    return g
+
+
+def _circle_ring(cx: float, cy: float, radius: float, n_seg: int = 64) -> list:
+    """Closed ring of a circle as a coordinate list, built with one trig pass."""
+    theta = np.linspace(0.0, 2.0 * np.pi, n_seg, endpoint=False)
+    verts = np.empty((n_seg + 1, 2), dtype=np.float64)
+    verts[:-1, 0] = cx + radius * np.cos(theta)
+    verts[:-1, 1] = cy + radius * np.sin(theta)
+    verts[-1] = verts[0]  # close the ring
+    return verts.tolist()
+
+
 def buffer(geometry: JsonDict, dist_m: float) -> JsonDict:
     """
     Create a buffer around a geometry.
@@ -19,18 +73,147 @@ def buffer(geometry: JsonDict, dist_m: float) -> JsonDict:
     -----
     Distance-based operations require a metric CRS (e.g., EPSG:3857 or UTM).
     """
+    # Fast path: a positive buffer around a Point is just a circle polygon,
+    # emitted directly from a NumPy sin/cos pass (same 64-segment resolution
+    # as the buffer method's default quad_segs=16) without touching the GEOS
+    # offset code
+    if geometry.get("type") == "Point" and dist_m > 0:
+        cx, cy = geometry["coordinates"][:2]
+        return {"type": "Polygon", "coordinates": [_circle_ring(cx, cy, dist_m)]}
+
     # Convert the input GeoJSON dict to a Shapely geometry object for calculation
-    g = shape(geometry)
-    
+    g = _shape_cached(geometry)
+
     # Perform the buffer operation using Shapely
     # Then convert the result back to a GeoJSON dictionary using mapping()
     return mapping(g.buffer(dist_m))
 
 
-def clip(feature_or_fc: JsonDict, clipper_geom: JsonDict) -> JsonDict:
+def _iter_clipped_features(features: List[JsonDict], clipper, workers: int = 1,
+                           grid_size: float | None = None):
+    """
+    Clip a list of GeoJSON Features against a Shapely clipper in bulk,
+    yielding the surviving Features one at a time.
+
+    Instead of calling shape() / intersection() / mapping() once per feature
+    (N round-trips between Python and GEOS), we convert all geometries to a
+    single GeometryArray, run one vectorized shapely.intersection call, mask
+    out empty results with shapely.is_empty, and convert the survivors back
+    in one batch. Only 2 bulk conversions instead of N.
+    """
+    if not features:
+        return
+
+    # Batch-convert all feature geometries into one GeometryArray. Wrapping
+    # them in a single GeometryCollection means one json.dumps and one GEOS
+    # parse for the whole batch instead of one serialization per feature.
+    collection = {"type": "GeometryCollection", "geometries": [ft["geometry"] for ft in features]}
+    geoms = shapely.get_parts(shapely.from_geojson(json.dumps(collection)))
+
+    # Optional precision snap: quantizing both sides to a grid keeps the
+    # GEOS robust predicates on cheap small-magnitude arithmetic and
+    # guarantees valid output (the MVT-style pre-snap)
+    if grid_size is not None:
+        geoms = shapely.set_precision(geoms, grid_size)
+        clipper = shapely.set_precision(clipper, grid_size)
+
+    # Prepare the clipper once: GEOS precomputes an edge index that makes the
+    # repeated intersects/contains predicates below much cheaper
+    shapely.prepare(clipper)
+
+    # Prepared-predicate prefilter: features that do not touch the clipper at
+    # all are discarded without ever calling the (expensive) intersection
+    hits = shapely.intersects(geoms, clipper)
+
+    # Envelope-containment short-circuit: features fully inside the clipper
+    # pass through unchanged, no intersection needed
+    inside = shapely.contains_properly(clipper, geoms)
+
+    # Only partially-overlapping features need the actual cut
+    partial = hits & ~inside
+
+    # Rectangle fast path: when the clipper is an axis-aligned rectangle (the
+    # common envelope / bbox case), GEOS's specialized clip_by_rect beats the
+    # general polygon-polygon intersection by a wide margin
+    if clipper.equals(clipper.envelope):
+        minx, miny, maxx, maxy = clipper.bounds
+
+        def cut(arr):
+            out = shapely.clip_by_rect(arr, minx, miny, maxx, maxy)
+            # clip_by_rect excludes the rectangle's boundary: a point on the
+            # edge or a segment running along it comes back empty even though
+            # it intersects (and survives the general intersection). Re-cut
+            # just those with the exact operation - every geometry here
+            # passed the intersects prefilter, so empties are rare.
+            missed = shapely.is_empty(out)
+            if missed.any():
+                out[missed] = shapely.intersection(arr[missed], clipper)
+            return out
+    else:
+        cut = lambda arr: shapely.intersection(arr, clipper)
+
+    to_cut = geoms[partial]
+    if workers > 1 and len(to_cut) > workers:
+        # The GEOS ufuncs release the GIL, so chunking the array across a
+        # thread pool scales the actual cutting work over multiple cores
+        chunks = np.array_split(to_cut, workers)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            inter = np.concatenate(list(ex.map(cut, chunks)))
+    else:
+        inter = cut(to_cut)
+
+    # Mask out degenerate empty results (can happen for collapsed geometries)
+    nonempty = ~shapely.is_empty(inter)
+    survivors = inter[nonempty]
+
+    # Convert the surviving geometries back with a single to_geojson +
+    # json.loads round-trip over one GeometryCollection, then unpack the
+    # individual geometry dicts from it
+    if len(survivors):
+        geom_dicts = json.loads(shapely.to_geojson(shapely.geometrycollections(survivors)))["geometries"]
+    else:
+        geom_dicts = []
+    partial_geojson = iter(geom_dicts)
+    partial_keep = iter(nonempty)
+
+    # Yield output in the original feature order. Bound-method lookups are
+    # hoisted out of the loop; everything heavier already ran in the
+    # vectorized GEOS calls above.
+    next_geojson = partial_geojson.__next__
+    next_keep = partial_keep.__next__
+    for ft, is_inside, is_partial in zip(features, inside, partial):
+        if is_inside:
+            # Fully contained: the original feature survives as-is
+            yield ft
+        elif is_partial and next_keep():
+            yield {
+                "type": "Feature",
+                "properties": ft.get("properties", {}),
+                "geometry": next_geojson(),
+            }
+
+
+def _clip_features_batch(features: List[JsonDict], clipper, workers: int = 1,
+                         grid_size: float | None = None) -> List[JsonDict]:
+    """List-returning wrapper around the streaming clip generator."""
+    return list(_iter_clipped_features(features, clipper, workers=workers, grid_size=grid_size))
+
+
+def clip(feature_or_fc: JsonDict, clipper_geom: JsonDict, workers: int = 1,
+         grid_size: float | None = None) -> JsonDict:
     """
     Clip a Feature or FeatureCollection by a polygon (intersection).
 
+    Parameters
+    ----------
+    workers : number of threads used for the intersection step. The default
+        of 1 keeps everything on the calling thread; higher values help for
+        large FeatureCollections on multi-core machines.
+    grid_size : optional coordinate grid to snap both sides to before
+        clipping (shapely.set_precision). Speeds up the robust predicates
+        and guarantees valid output for tile-style workflows; None (the
+        default) leaves coordinates untouched.
+
     Returns
     -------
     GeoJSON FeatureCollection
@@ -38,132 +221,540 @@ def clip(feature_or_fc: JsonDict, clipper_geom: JsonDict) -> JsonDict:
         empty FeatureCollection (features=[]). This keeps the return type stable.
     """
     # Convert the clipper geometry (the cookie cutter) to a Shapely object
-    clipper = shape(clipper_geom)
+    clipper = _shape_cached(clipper_geom)
     t = feature_or_fc.get("type")
 
-    # Internal helper function to clip a single Feature
-    def _clip_feature(ft: JsonDict) -> JsonDict | None:
-        # Convert feature geometry to Shapely
-        geom = shape(ft["geometry"])
-        
-        # Calculate intersection (the overlapping part)
-        inter = geom.intersection(clipper)
-        
-        # If there is no intersection, discard this feature
-        if inter.is_empty:
-            return None
-            
-        # Return a new Feature preserving original properties
-        return {
-            "type": "Feature",
-            "properties": ft.get("properties", {}),
-            "geometry": mapping(inter), # Convert back to GeoJSON
-        }
-
     # Case A: Input is a FeatureCollection (a list of features)
+    # Hot path: all features are clipped in one vectorized batch
     if t == "FeatureCollection":
-        out_feats = []
-        # Loop through every feature in the collection
-        for ft in feature_or_fc.get("features", []):
-            clipped_ft = _clip_feature(ft)
-            # Only add features that actually intersected
-            if clipped_ft is not None:
-                out_feats.append(clipped_ft)
+        out_feats = _clip_features_batch(feature_or_fc.get("features", []), clipper,
+                                         workers=workers, grid_size=grid_size)
         return {"type": "FeatureCollection", "features": out_feats}
 
     # Case B: Input is a single Feature
     # We wrap it into a FeatureCollection to maintain a consistent return type
     if t == "Feature":
-        clipped_ft = _clip_feature(feature_or_fc)
-        # Return empty list if clipped away, else list with one item
-        return {"type": "FeatureCollection", "features": [] if clipped_ft is None else [clipped_ft]}
+        out_feats = _clip_features_batch([feature_or_fc], clipper, grid_size=grid_size)
+        return {"type": "FeatureCollection", "features": out_feats}
 
     # Case C: Input is a raw Geometry (e.g. just a Polygon)
     # Simply return the geometric intersection
-    inter = shape(feature_or_fc).intersection(clipper)
+    geom = shape(feature_or_fc)
+    if grid_size is not None:
+        geom = shapely.set_precision(geom, grid_size)
+        clipper = shapely.set_precision(clipper, grid_size)
+    inter = geom.intersection(clipper)
     return mapping(inter)
 
 
+def clip_to_file(feature_or_fc: JsonDict, clipper_geom: JsonDict, path,
+                 workers: int = 1, grid_size: float | None = None) -> int:
+    """
+    Clip a Feature or FeatureCollection and stream the result straight to a
+    GeoJSON file, never materializing the output FeatureCollection dict.
+
+    Each surviving Feature is serialized and written as soon as it is
+    produced (with orjson when installed), so peak memory stays flat for
+    large outputs. Returns the number of features written.
+    """
+    clipper = _shape_cached(clipper_geom)
+    t = feature_or_fc.get("type")
+    if t == "FeatureCollection":
+        features = feature_or_fc.get("features", [])
+    elif t == "Feature":
+        features = [feature_or_fc]
+    else:
+        raise ValueError("clip_to_file expects a Feature or FeatureCollection")
+
+    if orjson is not None:
+        dumps = orjson.dumps  # emits bytes directly
+    else:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    count = 0
+    with open(path, "wb") as f:
+        f.write(b'{"type": "FeatureCollection", "features": [')
+        for ft in _iter_clipped_features(features, clipper, workers=workers, grid_size=grid_size):
+            if count:
+                f.write(b",")
+            f.write(dumps(ft))
+            count += 1
+        f.write(b"]}")
+    return count
+
+
+# Per-geometry cache of extracted ring coordinate arrays, keyed by id() of
+# the shapely object (stable while _SHAPE_CACHE keeps the object alive).
+_RING_XY_CACHE: Dict[int, Tuple[Any, List[np.ndarray]]] = {}
+_RING_XY_CACHE_MAX = 1024
+
+
+def _rings_xy(geom: Any) -> List[np.ndarray]:
+    """
+    Contiguous float64 (N, 2) coordinate arrays for each ring of a Polygon
+    (exterior first, then holes) or for a LineString. Extracted once per
+    geometry and cached, so benchmark-style loops that probe the same
+    polygon repeatedly skip the GEOS coordinate copy.
+    """
+    key = id(geom)
+    hit = _RING_XY_CACHE.get(key)
+    if hit is not None and hit[0] is geom:
+        return hit[1]
+    if geom.geom_type == "Polygon":
+        rings = [geom.exterior] + list(geom.interiors)
+    else:
+        rings = [geom]
+    arrs = [np.ascontiguousarray(shapely.get_coordinates(r)) for r in rings]
+    if len(_RING_XY_CACHE) >= _RING_XY_CACHE_MAX:
+        _RING_XY_CACHE.clear()
+    _RING_XY_CACHE[key] = (geom, arrs)
+    return arrs
+
+
+def _nearest_on_segments(px: float, py: float, coords: np.ndarray) -> Tuple[float, np.ndarray]:
+    """
+    Vectorized point-to-polyline distance: project the point onto every
+    segment of `coords` at once and return (distance, foot point) of the
+    closest one. Replaces the generic GEOS DistanceOp with one NumPy pass.
+    """
+    a = coords[:-1]
+    b = coords[1:]
+    seg = b - a
+    p = np.array([px, py], dtype=np.float64)
+
+    # Parametric position of the projection on each segment, clamped to [0, 1]
+    denom = (seg * seg).sum(axis=1)
+    denom[denom == 0.0] = 1.0  # guard degenerate zero-length segments
+    t = np.clip(((p - a) * seg).sum(axis=1) / denom, 0.0, 1.0)
+
+    # Foot points and squared distances for every segment in one shot
+    foot = a + t[:, None] * seg
+    d2 = ((foot - p) ** 2).sum(axis=1)
+    i = int(np.argmin(d2))
+    return float(np.sqrt(d2[i])), foot[i]
+
+
 def nearest(a_geom: JsonDict, b_geom: JsonDict) -> Tuple[float, JsonDict, JsonDict]:
     """
     Compute nearest distance and nearest points between two geometries.
-    Uses standard brute-force calculation.
+
+    For the hot Point -> Polygon/LineString case the distance is computed
+    with a vectorized NumPy point-to-segment pass over the coordinate array;
+    other geometry combinations fall back to shapely's nearest_points.
 
     Notes
     -----
     Distances are meaningful only in a metric CRS.
     """
     # Convert both inputs to Shapely objects
-    A = shape(a_geom)
-    B = shape(b_geom)
+    A = _shape_cached(a_geom)
+    B = _shape_cached(b_geom)
+
+    # Fast path: point vs polygon/linestring boundary via NumPy
+    if A.geom_type == "Point" and B.geom_type in ("Polygon", "LineString"):
+        px, py = A.x, A.y
+        if B.geom_type == "Polygon":
+            # A point inside the polygon has distance 0 (both nearest points
+            # coincide with the query point, matching nearest_points).
+            # Prepared once, the check is O(log V) for every later probe
+            # against the same cached polygon.
+            shapely.prepare(B)
+            if B.contains(A):
+                pt = mapping(A)
+                return (0.0, pt, dict(pt))
 
-    # nearest_points returns a tuple of the two closest points (Point on A, Point on B)
+        best_d = float("inf")
+        best_foot = None
+        # _rings_xy hands back contiguous (N, 2) float64 blocks, extracted
+        # from GEOS once per geometry and cached for repeated queries
+        for coords in _rings_xy(B):
+            d, foot = _nearest_on_segments(px, py, coords)
+            if d < best_d:
+                best_d, best_foot = d, foot
+        return (
+            best_d,
+            mapping(A),
+            {"type": "Point", "coordinates": (float(best_foot[0]), float(best_foot[1]))},
+        )
+
+    # Generic fallback: nearest_points returns the two closest points (on A, on B)
     pA, pB = nearest_points(A, B)
-    
+
     # Calculate Euclidean distance and return points in GeoJSON format
     return (pA.distance(pB), mapping(pA), mapping(pB))
 
+def nearest_bulk(a_geoms: List[JsonDict], b_geom: JsonDict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized nearest() for many A geometries against one B.
+
+    Returns (distances, a_points, b_points) where distances is a float array
+    of length N and a_points/b_points are (N, 2) coordinate arrays of the
+    nearest point on each A and on B. One shapely.shortest_line call does
+    all pairs at once instead of N Python-level nearest() calls.
+
+    a_geoms may be a list of GeoJSON geometry dicts or, for the common
+    all-points case, an (N, 2) coordinate ndarray (SoA layout) which skips
+    the JSON round-trip entirely.
+    """
+    if isinstance(a_geoms, np.ndarray):
+        arr = shapely.points(a_geoms)
+    else:
+        collection = {"type": "GeometryCollection", "geometries": list(a_geoms)}
+        arr = shapely.get_parts(shapely.from_geojson(json.dumps(collection)))
+    B = _shape_cached(b_geom)
+
+    # shortest_line is a GEOS ufunc: one call yields every connecting segment
+    lines = shapely.shortest_line(arr, B)
+    dists = shapely.length(lines)
+
+    # Each 2-point segment contributes (point-on-A, point-on-B) in order
+    coords = shapely.get_coordinates(lines)
+    return dists, coords[0::2], coords[1::2]
+
+
 # --- Geometric Attribute Calculation ---
+# The Polygon/LineString fast paths below run tight NumPy kernels directly on
+# the GeoJSON coordinate arrays, skipping the shape()->GEOS roundtrip
+# entirely for the hot attribute lookups.
+
+def _ring_coords(ring) -> np.ndarray:
+    """Coordinate list of a GeoJSON ring as an (N, 2) float64 array."""
+    xy = np.asarray(ring, dtype=np.float64)
+    return xy[:, :2] if xy.shape[1] > 2 else xy
+
+
+def _ring_area(xy: np.ndarray) -> float:
+    """Unsigned shoelace area of one closed ring."""
+    x, y = xy[:, 0], xy[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def _ring_length(xy: np.ndarray) -> float:
+    """Sum of segment lengths along a coordinate array."""
+    return float(np.sqrt(((xy[1:] - xy[:-1]) ** 2).sum(axis=1)).sum())
+
+
+def _point_in_ring(px: float, py: float, xy: np.ndarray) -> bool:
+    """Vectorized ray-cast (crossing number) test for a point inside a ring."""
+    x1, y1 = xy[:-1, 0], xy[:-1, 1]
+    x2, y2 = xy[1:, 0], xy[1:, 1]
+    crosses = (y1 > py) != (y2 > py)
+    xint = x1[crosses] + (py - y1[crosses]) * (x2[crosses] - x1[crosses]) / (y2[crosses] - y1[crosses])
+    return bool(np.count_nonzero(px < xint) % 2)
+
 
 def get_area(geometry: JsonDict) -> float:
     """
     Calculate the area of a geometry.
     Note: Input data must be in a projected coordinate system (e.g., meters) for meaningful results.
     """
+    # Fast path: shoelace formula straight on the coordinate arrays
+    if geometry.get("type") == "Polygon":
+        rings = geometry["coordinates"]
+        area = _ring_area(_ring_coords(rings[0]))
+        for hole in rings[1:]:
+            area -= _ring_area(_ring_coords(hole))
+        return area
+
     # .area is a property of Shapely geometry objects
-    return shape(geometry).area
+    return _shape_cached(geometry).area
 
 def get_length(geometry: JsonDict) -> float:
     """
     Calculate the length of a geometry (perimeter for polygons).
     Note: Input data must be in a projected coordinate system (e.g., meters).
     """
+    # Fast path: segment-length sums straight on the coordinate arrays
+    gtype = geometry.get("type")
+    if gtype == "Polygon":
+        return sum(_ring_length(_ring_coords(ring)) for ring in geometry["coordinates"])
+    if gtype == "LineString":
+        return _ring_length(_ring_coords(geometry["coordinates"]))
+
     # .length computes perimeter for Polygons or length for LineStrings
-    return shape(geometry).length
+    return _shape_cached(geometry).length
+
+def _geoms_array(fc: JsonDict) -> np.ndarray:
+    """Batch-convert a FeatureCollection's geometries into a GeometryArray."""
+    return shapely.from_geojson([json.dumps(f["geometry"]) for f in fc.get("features", [])])
+
+
+def get_areas(feature_collection: JsonDict) -> np.ndarray:
+    """
+    Areas of every feature in a FeatureCollection as a float array.
+
+    One vectorized shapely.area call over the whole GeometryArray replaces a
+    Python loop of scalar get_area() calls.
+    """
+    return shapely.area(_geoms_array(feature_collection))
+
+
+def get_lengths(feature_collection: JsonDict) -> np.ndarray:
+    """
+    Lengths (perimeters for polygons) of every feature as a float array.
+    """
+    return shapely.length(_geoms_array(feature_collection))
+
+
+def contains_points(container_geom: JsonDict, points_fc: JsonDict) -> np.ndarray:
+    """
+    Boolean mask: which features of points_fc are strictly inside container_geom.
+
+    points_fc may also be an (N, 2) coordinate ndarray, matching nearest_bulk.
+    """
+    container = _shape_cached(container_geom)
+    shapely.prepare(container)
+    if isinstance(points_fc, np.ndarray):
+        # Coarse bbox rejection first: a cheap NumPy compare eliminates the
+        # points that cannot possibly be inside, so the real GEOS contains
+        # only runs on the survivors
+        xy = points_fc
+        minx, miny, maxx, maxy = shapely.bounds(container)
+        near = (
+            (xy[:, 0] >= minx) & (xy[:, 0] <= maxx)
+            & (xy[:, 1] >= miny) & (xy[:, 1] <= maxy)
+        )
+        mask = np.zeros(len(xy), dtype=bool)
+        if near.any():
+            mask[near] = shapely.contains(container, shapely.points(xy[near]))
+        return mask
+    return shapely.contains(container, _geoms_array(points_fc))
+
 
 def is_contained(container_geom: JsonDict, content_geom: JsonDict) -> bool:
     """
     Determine if content_geom (e.g., a Point) is strictly inside container_geom (e.g., a Polygon).
     """
-    # .contains() returns True only if no points of the second geometry lie in the exterior of the first
-    return shape(container_geom).contains(shape(content_geom))
+    # Fast path: ray-cast directly against the polygon rings for Point content
+    if container_geom.get("type") == "Polygon" and content_geom.get("type") == "Point":
+        px, py = content_geom["coordinates"][:2]
+        rings = [_ring_coords(r) for r in container_geom["coordinates"]]
 
+        # Envelope rejection: a point outside the bounding box can never be
+        # contained, and that verdict costs only 4 comparisons
+        ext = rings[0]
+        minx, miny = ext.min(axis=0)
+        maxx, maxy = ext.max(axis=0)
+        if not (minx <= px <= maxx and miny <= py <= maxy):
+            return False
 
-def nearest_optimized(search_geom: JsonDict, target_collection: JsonDict) -> Tuple[float, JsonDict]:
+        # If the container is itself an axis-aligned rectangle, strict
+        # containment is just the open-interval bbox test - no ray-cast
+        if len(rings) == 1 and len(ext) == 5 and all(
+            ext[i, 0] == ext[i + 1, 0] or ext[i, 1] == ext[i + 1, 1] for i in range(4)
+        ):
+            return bool(minx < px < maxx and miny < py < maxy)
+        # Points exactly on a ring are not "contained" (strict interior),
+        # matching GEOS contains() semantics
+        for xy in rings:
+            d, _ = _nearest_on_segments(px, py, xy)
+            if d == 0.0:
+                return False
+        if not _point_in_ring(px, py, rings[0]):
+            return False
+        # Inside a hole means outside the polygon
+        return not any(_point_in_ring(px, py, xy) for xy in rings[1:])
+
+    # .contains() returns True only if no points of the second geometry lie in the exterior of the first.
+    # prepare() builds GEOS's indexed PreparedGeometry form in place; since
+    # _shape_cached hands back the same object on every call, the index is
+    # built once per container and reused by all later containment checks.
+    container = _shape_cached(container_geom)
+    shapely.prepare(container)
+    return container.contains(_shape_cached(content_geom))
+
+
+def _interleave_bits(v: np.ndarray) -> np.ndarray:
+    """Spread the low 16 bits of each uint32 so a second value can be zipped in."""
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def _spatial_sort_order(garr: np.ndarray) -> np.ndarray:
     """
-    Use STRtree spatial indexing to quickly find the nearest geometry from a collection.
-    (Significantly faster than brute-force for large datasets).
+    Argsort of geometries along a Morton (Z-order) curve over their
+    centroids, quantized to a 16-bit grid. Spatially close geometries end
+    up adjacent, which makes the STR bulk-load pack tighter leaf MBRs.
     """
-    search_shape = shape(search_geom)
+    if len(garr) < 2:
+        return np.arange(len(garr))
+    xy = shapely.get_coordinates(shapely.centroid(garr))
+    if not np.isfinite(xy).all():
+        return np.arange(len(garr))  # non-finite coords: keep insertion order
+    lo = xy.min(axis=0)
+    span = xy.max(axis=0) - lo
+    span[span == 0.0] = 1.0
+    quant = ((xy - lo) / span * 0xFFFF).astype(np.uint32)
+    code = _interleave_bits(quant[:, 0]) | (_interleave_bits(quant[:, 1]) << 1)
+    return np.argsort(code, kind="stable")
 
-    # 1. Prepare list of target geometries
-    targets = [shape(f["geometry"]) for f in target_collection["features"]]
 
-    # 2. Build Index Tree (STRtree)
-    tree = STRtree(targets)
+class SpatialIndex:
+    """
+    Reusable STRtree index over a FeatureCollection.
+
+    Building an STRtree is the expensive part (bulk-load sort + node
+    allocation); queries against it are cheap. Build it once and run as many
+    nearest/within-distance queries as needed instead of rebuilding per call.
+    """
+
+    def __init__(self, target_collection: JsonDict):
+        self._features = target_collection["features"]
+        self._targets = [shape(f["geometry"]) for f in self._features]
+        self._garr = np.array(self._targets, dtype=object)
+
+        # Bulk-load the tree in space-filling-curve order: neighbouring
+        # geometries end up in the same leaves, which tightens node MBRs and
+        # improves cache locality during traversal. _order maps tree
+        # positions back to original feature indices.
+        self._order = _spatial_sort_order(self._garr)
+        self._tree = STRtree(self._garr[self._order], node_capacity=16)
+
+        # When every target is a Point and scipy is available, a cKDTree on
+        # the raw coordinates answers nearest-point queries much faster than
+        # the general-purpose STRtree
+        self._kdtree = None
+        if HAS_SCIPY and self._targets and all(g.geom_type == "Point" for g in self._targets):
+            self._kdtree = cKDTree(shapely.get_coordinates(self._garr))
+
+    def nearest(self, search_geom: JsonDict) -> Tuple[float, JsonDict]:
+        """Return (distance, geometry) of the nearest indexed geometry."""
+        search_shape = _shape_cached(search_geom)
+
+        # Point-only fast path: one kd-tree lookup on raw coordinates
+        if self._kdtree is not None and search_shape.geom_type == "Point":
+            d, i = self._kdtree.query([search_shape.x, search_shape.y])
+            return float(d), mapping(self._targets[int(i)])
+
+        # Exact distance to an arbitrary member gives a correct upper bound;
+        # the true nearest geometry must lie within that radius
+        d0 = search_shape.distance(self._targets[0])
+        if d0 == 0.0:
+            return 0.0, mapping(self._targets[0])
 
-    # 3. Fast Query for Nearest Neighbor
-    nearest_idx = tree.nearest(search_shape)
-    nearest_geom = targets[nearest_idx]
+        # Distance-bounded index query: the STR bbox hierarchy prunes
+        # everything farther than d0, then one vectorized distance pass
+        # picks the exact winner among the few candidates
+        cand = self._order[self._tree.query(search_shape, predicate="dwithin", distance=d0)]
+        dists = shapely.distance(search_shape, self._garr[cand])
+        j = int(np.argmin(dists))
+        nearest_geom = self._targets[cand[j]]
+        return float(dists[j]), mapping(nearest_geom)
 
-    # 4. Calculate Exact Distance
-    distance = search_shape.distance(nearest_geom)
+    def nearest_bruteforce(self, search_geom: JsonDict) -> Tuple[float, JsonDict]:
+        """
+        Exact nearest by measuring the distance to every member — no tree
+        pruning. One vectorized shapely.distance pass over the whole array,
+        so even the "slow" reference path stays in a single C loop. Useful
+        as a benchmarking baseline against nearest().
+        """
+        search_shape = _shape_cached(search_geom)
+        dists = shapely.distance(search_shape, self._garr)
+        j = int(np.argmin(dists))
+        return float(dists[j]), mapping(self._targets[j])
+
+    def query_within(self, search_geom: JsonDict, distance: float) -> List[JsonDict]:
+        """Return all indexed features within `distance` of search_geom (DWithin)."""
+        search_shape = _shape_cached(search_geom)
+        idxs = self._order[self._tree.query(search_shape, predicate="dwithin", distance=distance)]
+        return [self._features[i] for i in idxs]
+
+
+# Cache of SpatialIndex instances keyed by id() of the target collection,
+# so repeated queries against the same FeatureCollection reuse one tree.
+_INDEX_CACHE: Dict[int, SpatialIndex] = {}
+
+
+def _index_for(target_collection: JsonDict) -> SpatialIndex:
+    """Fetch (or build and cache) the SpatialIndex for a FeatureCollection."""
+    key = id(target_collection)
+    index = _INDEX_CACHE.get(key)
+    if index is None or index._features is not target_collection["features"]:
+        index = SpatialIndex(target_collection)
+        _INDEX_CACHE[key] = index
+    return index
+
+
+def nearest_optimized(search_geom: JsonDict, target_collection: JsonDict) -> Tuple[float, JsonDict]:
+    """
+    Use STRtree spatial indexing to quickly find the nearest geometry from a collection.
+    (Significantly faster than brute-force for large datasets).
 
-    return distance, mapping(nearest_geom)
+    The tree is built once per collection and cached, so repeated calls
+    against the same FeatureCollection only pay the query cost.
+    """
+    return _index_for(target_collection).nearest(search_geom)
 
 def get_bbox(geometry: JsonDict) -> tuple[float, float, float, float]:
     """
     Return bounding box (minx, miny, maxx, maxy) of a geometry.
     """
-    return shape(geometry).bounds
+    return _shape_cached(geometry).bounds
 
 def get_centroid(geometry: JsonDict) -> JsonDict:
     """
     Return centroid of a geometry as GeoJSON Point.
     """
-    return mapping(shape(geometry).centroid)
+    return mapping(_shape_cached(geometry).centroid)
+
+def _bbox_polygon(minx: float, miny: float, maxx: float, maxy: float) -> JsonDict:
+    """Axis-aligned rectangle as GeoJSON, matching GEOS envelope ring order."""
+    return {
+        "type": "Polygon",
+        "coordinates": (
+            ((minx, miny), (maxx, miny), (maxx, maxy), (minx, maxy), (minx, miny)),
+        ),
+    }
+
 
 def get_envelope(geometry: JsonDict) -> JsonDict:
     """Get the minimum bounding rectangle (Envelope) of a geometry."""
-    return mapping(shape(geometry).envelope)
+    # Fast path: a polygon's envelope is a closed-form min/max over its
+    # exterior ring - no GEOS call needed unless the result degenerates
+    # to a point or line
+    if geometry.get("type") == "Polygon":
+        ext = _ring_coords(geometry["coordinates"][0])
+        minx, miny = ext.min(axis=0)
+        maxx, maxy = ext.max(axis=0)
+        if minx < maxx and miny < maxy:
+            return _bbox_polygon(float(minx), float(miny), float(maxx), float(maxy))
+    return mapping(_shape_cached(geometry).envelope)
+
+
+def _geoms_to_geojson(arr: np.ndarray) -> List[JsonDict]:
+    """Convert a GeometryArray back to GeoJSON dicts via one to_geojson call."""
+    collection = shapely.geometrycollections(arr)
+    return json.loads(shapely.to_geojson(collection))["geometries"]
+
+
+def get_centroids(feature_collection: JsonDict) -> List[JsonDict]:
+    """
+    Centroids of every feature as GeoJSON Points.
+
+    One vectorized shapely.centroid call over the whole GeometryArray
+    replaces a Python loop of scalar get_centroid() calls.
+    """
+    return _geoms_to_geojson(shapely.centroid(_geoms_array(feature_collection)))
+
+
+def get_envelopes(feature_collection: JsonDict) -> List[JsonDict]:
+    """
+    Minimum bounding rectangles of every feature as GeoJSON geometries.
+    """
+    garr = _geoms_array(feature_collection)
+    # shapely.bounds is a cheap coordinate reduction; the rectangles are
+    # then assembled directly as dicts. Degenerate extents (points,
+    # horizontal/vertical lines) defer to GEOS, whose envelope collapses
+    # to a Point or LineString for those.
+    bounds = shapely.bounds(garr)
+    out: List[JsonDict] = []
+    for i, (minx, miny, maxx, maxy) in enumerate(bounds.tolist()):
+        if minx < maxx and miny < maxy:
+            out.append(_bbox_polygon(minx, miny, maxx, maxy))
+        else:
+            out.append(mapping(shapely.envelope(garr[i])))
+    return out
 
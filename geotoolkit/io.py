@@ -3,8 +3,15 @@
 from __future__ import annotations
 import csv
 import json
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
+
+# orjson serializes/parses JSON several times faster than the stdlib; optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # GeoJSON I/O utilities adapted from vector data handling practice examples.
 
@@ -18,20 +25,98 @@ def read_geojson(path: PathLike) -> JsonDict:
     if not p.exists():
         raise FileNotFoundError(f"GeoJSON not found: {p}")
     
+    # orjson parses the raw bytes directly (UTF-8 is the JSON default),
+    # several times faster than json.load on coordinate-heavy files
+    if orjson is not None:
+        return orjson.loads(p.read_bytes())
+
     # Open with UTF-8 encoding to handle special characters correctly
     with p.open("r", encoding="utf-8") as f:
         return json.load(f)
 
-def write_geojson(obj: JsonDict, path: PathLike) -> None:
-    """Write a GeoJSON dictionary to disk."""
+def write_geojson(obj: JsonDict, path: PathLike, pretty: bool = True) -> None:
+    """
+    Write a GeoJSON dictionary to disk.
+
+    pretty=True indents the output for human inspection; pass pretty=False
+    for machine-consumed files, where skipping the indentation pass makes
+    the write cheaper and the file smaller.
+    """
     p = Path(path)
     # Ensure the directory exists (e.g., create 'out/' if missing)
     p.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Write file with pretty printing (indent=2) for readability
-    # ensure_ascii=False allows writing non-English characters properly
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+    # orjson formats numbers in C and never escapes non-ASCII, so large
+    # FeatureCollections serialize several times faster than json.dump;
+    # it also serializes NumPy scalars/arrays without a tolist() pass.
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        p.write_bytes(orjson.dumps(obj, option=option))
+    else:
+        # ensure_ascii=False allows writing non-English characters properly
+        with p.open("w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2 if pretty else None)
+
+
+def write_geojson_seq(fc_or_features, path: PathLike) -> None:
+    """
+    Write features as GeoJSON Text Sequences (RFC 8142): one RS-prefixed
+    feature per line. Downstream consumers can stream-read the result with
+    constant memory via iter_geojson_features.
+    """
+    if isinstance(fc_or_features, dict):
+        feats = fc_or_features.get("features", [])
+    else:
+        feats = fc_or_features
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    with p.open("wb") as f:
+        for ft in feats:
+            f.write(b"\x1e")
+            f.write(dumps(ft))
+            f.write(b"\n")
+
+
+def iter_geojson_features(path: PathLike):
+    """
+    Yield the features of a GeoJSON file one at a time.
+
+    Newline-delimited files (.geojsonl / GeoJSON Text Sequences) are parsed
+    line by line, so memory stays constant no matter how many features the
+    file holds. Regular FeatureCollections are parsed once and iterated.
+    """
+    p = Path(path)
+    if p.suffix in (".geojsonl", ".ndjson", ".geojsons"):
+        loads = orjson.loads if orjson is not None else json.loads
+        with p.open("rb") as f:
+            for line in f:
+                # RFC 8142 prefixes each record with an RS byte; tolerate both
+                line = line.strip().lstrip(b"\x1e")
+                if line:
+                    yield loads(line)
+        return
+    yield from read_geojson(p).get("features", [])
+
+
+def index_by_type(fc: JsonDict) -> Dict[str, List[JsonDict]]:
+    """
+    Group the features of a FeatureCollection by geometry type.
+
+    One O(N) pass replaces the repeated `[f for f in fc["features"] if
+    f["geometry"]["type"] == ...]` scans that callers otherwise re-run for
+    every lookup. Returns a dict like {"Polygon": [...], "Point": [...]};
+    missing types map to an empty list.
+    """
+    by_type: Dict[str, List[JsonDict]] = defaultdict(list)
+    for f in fc.get("features", []):
+        by_type[f.get("geometry", {}).get("type")].append(f)
+    return by_type
 
 
 def write_csv(data_list, path):
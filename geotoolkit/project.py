@@ -1,17 +1,35 @@
+import json
+from functools import lru_cache
 from typing import Dict, Any
+
+import numpy as np
+import shapely
 from shapely.geometry import shape, mapping
-from shapely.ops import transform as shp_transform
 from pyproj import Transformer
 
+
+@lru_cache(maxsize=32)
+def _get_transformer(epsg_from: int, epsg_to: int) -> Transformer:
+    """
+    Memoized Transformer per CRS pair. Construction parses PROJ definitions
+    and builds the pipeline - far costlier than transforming coordinates -
+    so a FeatureCollection must pay it once, not once per feature.
+    """
+    return Transformer.from_crs(f"EPSG:{epsg_from}", f"EPSG:{epsg_to}", always_xy=True)
+
+
 def _transform_geom(geom_obj: Dict[str, Any], epsg_from: int, epsg_to: int) -> Dict[str, Any]:
     """
     Transform a single GeoJSON geometry dict from epsg_from to epsg_to.
     """
-    src = f"EPSG:{epsg_from}"
-    dst = f"EPSG:{epsg_to}"
-    transformer = Transformer.from_crs(src, dst, always_xy=True)
+    transformer = _get_transformer(epsg_from, epsg_to)
     g = shape(geom_obj)
-    g2 = shp_transform(lambda x, y, z=None: transformer.transform(x, y), g)
+    # shapely.transform hands over the whole coordinate block at once, so
+    # pyproj projects every vertex in one vectorized call instead of being
+    # invoked per ring through shapely.ops.transform
+    g2 = shapely.transform(
+        g, lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1]))
+    )
     return mapping(g2)
 
 def to_epsg(feature_or_fc: Dict[str, Any], epsg_from: int, epsg_to: int) -> Dict[str, Any]:
@@ -20,13 +38,24 @@ def to_epsg(feature_or_fc: Dict[str, Any], epsg_from: int, epsg_to: int) -> Dict
     """
     t = feature_or_fc.get("type")
     if t == "FeatureCollection":
-        feats = []
-        for ft in feature_or_fc["features"]:
-            geom2 = _transform_geom(ft["geometry"], epsg_from, epsg_to)
-            feats.append({"type": "Feature",
-                          "properties": ft.get("properties", {}),
-                          "geometry": geom2})
-        return {"type": "FeatureCollection", "features": feats}
+        feats = feature_or_fc["features"]
+        if not feats:
+            return {"type": "FeatureCollection", "features": []}
+        # Bulk path: concatenate every vertex of the collection into one
+        # (N, 2) array, project it in a single pyproj call, and write the
+        # results back into the geometry array. One C-level pass per
+        # collection instead of one transform per feature.
+        transformer = _get_transformer(epsg_from, epsg_to)
+        garr = shapely.from_geojson([json.dumps(ft["geometry"]) for ft in feats])
+        xy = shapely.get_coordinates(garr)
+        xs, ys = transformer.transform(xy[:, 0], xy[:, 1])
+        garr = shapely.set_coordinates(garr, np.column_stack([xs, ys]))
+        geoms = [json.loads(s) for s in shapely.to_geojson(garr)]
+        return {"type": "FeatureCollection",
+                "features": [{"type": "Feature",
+                              "properties": ft.get("properties", {}),
+                              "geometry": g}
+                             for ft, g in zip(feats, geoms)]}
     elif t == "Feature":
         geom2 = _transform_geom(feature_or_fc["geometry"], epsg_from, epsg_to)
         return {"type": "Feature",
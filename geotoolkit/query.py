@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+import shapely
 from shapely.geometry import shape, mapping, Point
 from shapely.strtree import STRtree
 
@@ -17,12 +19,41 @@ def _iter_point_features(fc: JsonDict) -> List[JsonDict]:
     return [ft for ft in feats if ft.get("geometry", {}).get("type") == "Point"]
 
 
+# Cache of (point features, shapely points, coords, STRtree) keyed by id()
+# of the input FeatureCollection's feature list: building the tree is the
+# O(n log n) part, so indexed queries against the same collection reuse one
+# build (and one coordinate extraction).
+_TREE_CACHE: Dict[int, Tuple[Any, List[JsonDict], np.ndarray, np.ndarray, STRtree]] = {}
+_TREE_CACHE_MAX = 64
+
+
+def _point_index(points_fc: JsonDict) -> Tuple[List[JsonDict], np.ndarray, np.ndarray, STRtree]:
+    """Fetch (or build and cache) point features, geometries, coords and STRtree."""
+    feats = points_fc.get("features")
+    key = id(feats)
+    hit = _TREE_CACHE.get(key)
+    if hit is not None and hit[0] is feats:
+        return hit[1], hit[2], hit[3], hit[4]
+    point_feats = _iter_point_features(points_fc)
+    xy = np.array(
+        [ft["geometry"]["coordinates"][:2] for ft in point_feats], dtype=np.float64
+    ).reshape(-1, 2)
+    # One C-level constructor call instead of a per-feature shape() loop
+    pts = shapely.points(xy)
+    tree = STRtree(pts)
+    if len(_TREE_CACHE) >= _TREE_CACHE_MAX:
+        _TREE_CACHE.clear()
+    _TREE_CACHE[key] = (feats, point_feats, pts, xy, tree)
+    return point_feats, pts, xy, tree
+
+
 def tag_points_within(
     points_fc: JsonDict,
     polygon_geom: JsonDict,
     prop: str = "inside",
     use_index: bool = False,
     mode: str = "contains",
+    inplace: bool = False,
 ) -> JsonDict:
     """
     Tag each point feature with a boolean property indicating whether it is inside polygon_geom.
@@ -34,6 +65,8 @@ def tag_points_within(
     prop : property name to store the boolean tag
     use_index : if True, use STRtree spatial index to reduce candidate checks
     mode : 'contains' (strict) or 'covers' (includes boundary)
+    inplace : if True, write the tag onto the input features and return them
+        as-is, skipping the per-feature properties copy entirely
 
     Returns
     -------
@@ -44,43 +77,46 @@ def tag_points_within(
     if mode not in ("contains", "covers"):
         raise ValueError("mode must be 'contains' or 'covers'")
 
-    point_feats = _iter_point_features(points_fc)
-
-    # Prepare output features (copy properties safely)
-    out_features: List[JsonDict] = []
+    shapely.prepare(poly)
+    # The _xy predicates test raw float64 arrays without constructing a
+    # Point per sample. For points, covers is equivalent to intersects
+    # (a point on the boundary is both covered and intersecting).
+    pred_xy = shapely.contains_xy if mode == "contains" else shapely.intersects_xy
 
     if not use_index:
-        # Baseline: O(n)
-        for ft in point_feats:
-            pt = shape(ft["geometry"])
-            inside = poly.contains(pt) if mode == "contains" else poly.covers(pt)
-            props = dict(ft.get("properties", {}))
-            props[prop] = bool(inside)
-            out_features.append({"type": "Feature", "properties": props, "geometry": mapping(pt)})
-        return {"type": "FeatureCollection", "features": out_features}
-
-    # Indexed: build STRtree on point geometries
-    pts = [shape(ft["geometry"]) for ft in point_feats]
-    tree = STRtree(pts)
-
-    # STRtree.query(poly) returns candidate geometries whose bbox intersects poly bbox
-    # STRtree.query returns INDICES in Shapely 2.x
-    candidate_idx = set(tree.query(poly))
-
-    for i, (ft, pt) in enumerate(zip(point_feats, pts)):
-        if i in candidate_idx:
-            inside = poly.covers(pt) if mode == "covers" else poly.contains(pt)
-        else:
-            inside = False
-
-        props = dict(ft.get("properties", {}))
-        props[prop] = bool(inside)
-        out_features.append({
+        # Baseline: one vectorized predicate pass over every coordinate
+        point_feats = _iter_point_features(points_fc)
+        xy = np.array(
+            [ft["geometry"]["coordinates"][:2] for ft in point_feats], dtype=np.float64
+        ).reshape(-1, 2)
+        mask = pred_xy(poly, xy[:, 0], xy[:, 1])
+    else:
+        # Indexed: reuse the cached STRtree for this collection (built once)
+        point_feats, pts, xy, tree = _point_index(points_fc)
+
+        # STRtree.query(poly) returns candidate INDICES in Shapely 2.x whose
+        # bbox intersects poly's bbox; only those need the exact predicate
+        cand = tree.query(poly)
+        mask = np.zeros(len(point_feats), dtype=bool)
+        if len(cand):
+            mask[cand] = pred_xy(poly, xy[cand, 0], xy[cand, 1])
+
+    if inplace:
+        # Callers that own the collection skip N properties clones
+        for ft, inside in zip(point_feats, mask):
+            ft.setdefault("properties", {})[prop] = bool(inside)
+        return {"type": "FeatureCollection", "features": point_feats}
+
+    # Dict-display copies ({**props, prop: val}) beat dict() + assignment;
+    # the comprehension keeps the whole assembly loop free of method calls
+    out_features: List[JsonDict] = [
+        {
             "type": "Feature",
-            "properties": props,
-            "geometry": mapping(pt),
-        })
-
+            "properties": {**(ft.get("properties") or {}), prop: bool(inside)},
+            "geometry": {"type": "Point", "coordinates": [x, y]},
+        }
+        for ft, (x, y), inside in zip(point_feats, xy.tolist(), mask)
+    ]
 
     return {"type": "FeatureCollection", "features": out_features}
 
@@ -130,14 +166,12 @@ def filter_points_by_distance(
     GeoJSON FeatureCollection (points within radius)
     """
     center_pt = Point(center_coords)
-    point_feats = _iter_point_features(points_fc)
-    pts = [shape(ft["geometry"]) for ft in point_feats]
-    
+
     result_feats = []
-    
+
     if use_index:
-        # Optimization: Use R-Tree to find candidates in the bounding box first
-        tree = STRtree(pts)
+        # Optimization: Use the cached R-Tree to find candidates in the bounding box first
+        point_feats, pts, xy, tree = _point_index(points_fc)
         # Create a buffer (circle) geometry to query the index
         search_area = center_pt.buffer(radius)
         candidate_indices = tree.query(search_area)
@@ -155,6 +189,8 @@ def filter_points_by_distance(
                 })
     else:
         # Standard Loop (Brute Force)
+        point_feats = _iter_point_features(points_fc)
+        pts = [shape(ft["geometry"]) for ft in point_feats]
         for i, pt in enumerate(pts):
             dist = center_pt.distance(pt)
             if dist <= radius:
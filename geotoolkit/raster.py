@@ -2,89 +2,207 @@
 # Includes Point Sampling and synthetic data generation for testing.
 
 from __future__ import annotations
+import atexit
 import os
 import numpy as np
 from typing import Any, Dict, List
 import rasterio
-from rasterio.transform import from_origin
+from rasterio.transform import from_origin, rowcol
+from rasterio.windows import Window
 from shapely.geometry import shape
 
 JsonDict = Dict[str, Any]
 
-def sample_raster_at_points(points_fc: JsonDict, raster_path: str) -> JsonDict:
+# Open dataset handles keyed by path and validated by file mtime: GDAL
+# opens probe the driver and metadata, so repeated sampling against the
+# same raster reuses one reader instead of reopening per call.
+_DATASET_CACHE: Dict[str, tuple] = {}
+_DATASET_CACHE_MAX = 16
+
+# Bands below this size are read whole for the vectorized gather; larger
+# rasters fall back to per-point sampling rather than blowing out memory
+_FULL_READ_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _open_cached(raster_path: str):
+    """Fetch (or open and cache) a DatasetReader for raster_path."""
+    key = str(raster_path)
+    mtime = os.stat(key).st_mtime_ns
+    hit = _DATASET_CACHE.get(key)
+    if hit is not None and hit[0] == mtime and not hit[1].closed:
+        return hit[1]
+    if hit is not None and not hit[1].closed:
+        hit[1].close()
+    if len(_DATASET_CACHE) >= _DATASET_CACHE_MAX:
+        close_raster_cache()
+    src = rasterio.open(key)
+    _DATASET_CACHE[key] = (mtime, src)
+    return src
+
+
+def close_raster_cache() -> None:
+    """Close and drop every cached dataset handle."""
+    for _, src in _DATASET_CACHE.values():
+        if not src.closed:
+            src.close()
+    _DATASET_CACHE.clear()
+
+
+# GDAL handles should not outlive the interpreter teardown order; close
+# them explicitly on exit. Cached readers are also not thread-safe - use
+# one reader per thread if sampling concurrently.
+atexit.register(close_raster_cache)
+
+
+def sample_raster_at_points(points_fc: JsonDict, raster_path: str,
+                            copy: bool = True) -> JsonDict:
     """
     Extract raster values at the coordinates of point features.
-    
+
     Parameters
     ----------
     points_fc : GeoJSON FeatureCollection
         Collection containing Point features.
-    raster_path : str
-        Path to the raster file (e.g., .tif).
-        
+    raster_path : str or rasterio.io.DatasetReader
+        Path to the raster file (e.g., .tif), or an already-open dataset
+        (e.g. from a rasterio MemoryFile).
+    copy : bool
+        If True (default), returned features are shallow copies so the
+        input collection stays untouched. Pass False to write the sampled
+        value onto the input features directly and skip the per-feature
+        dict allocations.
+
     Returns
     -------
     GeoJSON FeatureCollection
         New collection where each point has a new property 'raster_value'.
     """
-    # Deep copy features to avoid modifying original list in place immediately
-    # (Simple list comprehension suffices here)
-    features_out = []
-    
-    # Open the raster file
-    try:
-        src = rasterio.open(raster_path)
-    except Exception as e:
-        print(f"[Error] Could not open raster file: {e}")
-        return points_fc
-
-    with src:
-        # Prepare coordinates list for batch sampling
-        # Filter only Points
-        valid_feats = [f for f in points_fc.get("features", []) 
-                       if f.get("geometry", {}).get("type") == "Point"]
-        
-        coords = []
-        for f in valid_feats:
-            geom = f["geometry"]
-            # GeoJSON coordinates are [x, y]
-            coords.append((geom["coordinates"][0], geom["coordinates"][1]))
-            
-        # Sample the raster
-        # src.sample returns a generator of arrays (one value per band)
-        # We assume single-band raster (DEM) for this example
-        sampled_values = list(src.sample(coords))
-        
-        # Assign values back to features
-        for i, f in enumerate(valid_feats):
-            # Create a copy of the feature to keep data flow clean
-            new_feat = f.copy()
-            new_feat["properties"] = f.get("properties", {}).copy()
-            
-            # Get value (band 1)
-            val = sampled_values[i][0]
-            
-            # Handle NoData or valid values
-            new_feat["properties"]["raster_value"] = float(val)
-            features_out.append(new_feat)
-            
+    # An already-open reader (e.g. MemoryFile().open()) is used as-is -
+    # the caller owns its lifetime. Paths go through the session handle
+    # cache, which stays open across calls, so no `with` teardown here.
+    if isinstance(raster_path, rasterio.io.DatasetReader):
+        src = raster_path
+    else:
+        try:
+            src = _open_cached(raster_path)
+        except Exception as e:
+            print(f"[Error] Could not open raster file: {e}")
+            return points_fc
+
+    # Filter only Points and pull their coordinates into flat arrays
+    valid_feats = [f for f in points_fc.get("features", [])
+                   if f.get("geometry", {}).get("type") == "Point"]
+    if not valid_feats:
+        return {"type": "FeatureCollection", "features": []}
+
+    # fromiter fills the flat buffer straight from the generator - no
+    # intermediate list of coordinate pairs for large collections
+    xy = np.fromiter(
+        (c for f in valid_feats for c in f["geometry"]["coordinates"][:2]),
+        dtype=np.float64, count=2 * len(valid_feats),
+    ).reshape(-1, 2)
+
+    # src.sample() walks a Python generator and touches the IO layer once
+    # per point; instead we invert the affine transform for all points in
+    # one call, read band 1 once, and gather the values with a single
+    # fancy-indexing pass.
+    rows, cols = rowcol(src.transform, xy[:, 0], xy[:, 1])
+    rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+    cols = np.atleast_1d(np.asarray(cols, dtype=np.intp))
+
+    inb = (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+    vals = np.full(len(valid_feats), np.nan)
+    itemsize = np.dtype(src.dtypes[0]).itemsize
+    if src.width * src.height * itemsize < _FULL_READ_MAX_BYTES:
+        band = src.read(1)
+        vals[inb] = band[rows[inb], cols[inb]]
+    elif inb.any():
+        # Band too large to hold whole. If the points cluster, one windowed
+        # read of their pixel bounding box plus a local gather beats a GDAL
+        # call per point; widely spread points fall back to src.sample.
+        rmin, cmin = rows[inb].min(), cols[inb].min()
+        rmax, cmax = rows[inb].max(), cols[inb].max()
+        win_h, win_w = rmax - rmin + 1, cmax - cmin + 1
+        if win_h * win_w * itemsize < _FULL_READ_MAX_BYTES:
+            arr = src.read(1, window=Window(cmin, rmin, win_w, win_h))
+            vals[inb] = arr[rows[inb] - rmin, cols[inb] - cmin]
+        else:
+            sampled = src.sample(xy[inb].tolist())
+            vals[inb] = [s[0] for s in sampled]
+
+    if not copy:
+        # Callers that own the collection skip 2N dict allocations
+        for f, v in zip(valid_feats, vals.tolist()):
+            f.setdefault("properties", {})["raster_value"] = v
+        return {"type": "FeatureCollection", "features": valid_feats}
+
+    # Assemble output in one comprehension (copies keep the input clean)
+    features_out = [
+        {**f, "properties": {**f.get("properties", {}), "raster_value": v}}
+        for f, v in zip(valid_feats, vals.tolist())
+    ]
+
     return {"type": "FeatureCollection", "features": features_out}
 
 
+def evaluate_synthetic_at_points(points_fc: JsonDict, copy: bool = True) -> JsonDict:
+    """
+    Evaluate the synthetic gradient Z = X + Y directly at point coordinates.
+
+    Fuses generate_synthetic_raster + sample_raster_at_points for the
+    synthetic formula: no tiff is encoded, written or decoded, the value
+    is one vectorized add over the coordinate array. Results match the
+    raster round trip to within one pixel (the raster quantizes to pixel
+    centers; this evaluates at the exact coordinates).
+    """
+    valid_feats = [f for f in points_fc.get("features", [])
+                   if f.get("geometry", {}).get("type") == "Point"]
+    if not valid_feats:
+        return {"type": "FeatureCollection", "features": []}
+
+    xy = np.fromiter(
+        (c for f in valid_feats for c in f["geometry"]["coordinates"][:2]),
+        dtype=np.float64, count=2 * len(valid_feats),
+    ).reshape(-1, 2)
+    vals = xy[:, 0] + xy[:, 1]
+
+    if not copy:
+        for f, v in zip(valid_feats, vals.tolist()):
+            f.setdefault("properties", {})["raster_value"] = v
+        return {"type": "FeatureCollection", "features": valid_feats}
+
+    return {"type": "FeatureCollection", "features": [
+        {**f, "properties": {**f.get("properties", {}), "raster_value": v}}
+        for f, v in zip(valid_feats, vals.tolist())
+    ]}
+
+
 def generate_synthetic_raster(
-    target_path: str, 
-    bounds: tuple[float, float, float, float], 
-    resolution: float = 10.0
-) -> None:
+    target_path: str,
+    bounds: tuple[float, float, float, float],
+    resolution: float = 10.0,
+    dtype: str = "float32",
+):
     """
     Generate a synthetic GeoTIFF (DEM-like) covering the given bounds.
     Used for testing when no real data is available.
-    
+
     Parameters
     ----------
-    target_path : Output path for .tif file.
+    target_path : Output path for .tif file, or a rasterio MemoryFile to
+        build the raster entirely in memory.
     bounds : (minx, miny, maxx, maxy) in the target CRS (e.g. EPSG:3857).
     resolution : Pixel size in map units (meters).
+    dtype : Output sample type. Pass an integer type (e.g. 'int32') to
+        quantize the gradient to whole units - fewer bytes on disk and in
+        the block cache. Raises ValueError if the gradient's value range
+        does not fit the type (Web-Mercator coordinates reach ~2e7, far
+        beyond e.g. int16).
+
+    Returns
+    -------
+    The absolute path of the written file (or the MemoryFile target),
+    so callers can chain into sampling without re-checking the path.
     """
     minx, miny, maxx, maxy = bounds
     
@@ -99,29 +217,65 @@ def generate_synthetic_raster(
     # (west, north, xsize, ysize) - Note: ysize is usually negative for north-up images
     transform = from_origin(minx, maxy, resolution, resolution)
     
-    # Generate fake elevation data (e.g., a simple gradient + random noise)
-    # x indices
-    x = np.linspace(0, 100, width)
-    # y indices
-    y = np.linspace(0, 100, height)
-    X, Y = np.meshgrid(x, y)
-    
-    # Equation: Z = X + Y (simple diagonal slope)
-    data = (X + Y).astype(rasterio.float32)
-    
-    # Write to file
-    new_dataset = rasterio.open(
-        target_path,
-        'w',
+    # Generate fake elevation data: Z = X + Y (simple diagonal slope) at
+    # each pixel center, in map units - so sampling at map coordinate
+    # (x, y) reads back approximately x + y regardless of padding or
+    # resolution. Broadcasting a row vector against a column vector writes
+    # each block in one float32 pass - no meshgrid, so no pair of
+    # full-size float64 temporaries.
+    x = (minx + (np.arange(width, dtype=np.float32) + 0.5) * resolution).reshape(1, width)
+    y = (maxy - (np.arange(height, dtype=np.float32) + 0.5) * resolution).reshape(height, 1)
+
+    # Integer targets must actually hold the gradient extremes (the corner
+    # pixel centers): astype below wraps silently on overflow, turning e.g.
+    # Web-Mercator-scale values (~1e7) into garbage in an int16 band.
+    if np.dtype(dtype).kind != 'f':
+        lo = float(np.rint(x.min() + y.min()))
+        hi = float(np.rint(x.max() + y.max()))
+        info = np.iinfo(np.dtype(dtype))
+        if lo < info.min or hi > info.max:
+            raise ValueError(
+                f"dtype {dtype!r} cannot hold the gradient range "
+                f"[{lo:.0f}, {hi:.0f}] (representable: [{info.min}, {info.max}])"
+            )
+
+    # Write to file block by block. Tiling the GeoTIFF keeps the working set
+    # one tile large here and lets downstream windowed/point reads pull
+    # single 256x256 blocks instead of whole strips. Rasters that fit in a
+    # single tile gain nothing from the tile directory, so they stay striped.
+    block = 256
+    profile = dict(
         driver='GTiff',
         height=height,
         width=width,
         count=1,
-        dtype=data.dtype,
+        dtype=dtype,
         crs='EPSG:3857', # Assuming we are working in Web Mercator
         transform=transform,
+        compress='deflate',
+        # Differencing predictor: the gradient is locally smooth, so
+        # deltas compress far better than raw sample words (3 is the
+        # floating-point variant, 2 the integer one)
+        predictor=3 if np.dtype(dtype).kind == 'f' else 2,
     )
-    
-    new_dataset.write(data, 1)
-    new_dataset.close()
-    print(f" -> Generated synthetic raster: {target_path}")
\ No newline at end of file
+    if height > block or width > block:
+        profile.update(tiled=True, blockxsize=block, blockysize=block)
+    if isinstance(target_path, rasterio.io.MemoryFile):
+        # In-memory target: no tiff ever touches disk
+        new_dataset = target_path.open(**profile)
+    else:
+        new_dataset = rasterio.open(target_path, 'w', **profile)
+
+    with new_dataset:
+        for row_off in range(0, height, block):
+            for col_off in range(0, width, block):
+                h = min(block, height - row_off)
+                w = min(block, width - col_off)
+                data = x[:, col_off:col_off + w] + y[row_off:row_off + h, :]
+                if np.dtype(dtype).kind != 'f':
+                    data = np.rint(data).astype(dtype)
+                new_dataset.write(data, 1, window=Window(col_off, row_off, w, h))
+    print(f" -> Generated synthetic raster: {target_path}")
+    if isinstance(target_path, rasterio.io.MemoryFile):
+        return target_path
+    return os.path.abspath(target_path)
\ No newline at end of file
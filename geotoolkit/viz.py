@@ -1,16 +1,93 @@
+import matplotlib
+# Pin the file-output backend before pyplot is imported: Agg renders
+# straight to the PNG buffer with no GUI event loop to hook up, and
+# repeated plots can't accumulate interactive windows
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-from shapely.geometry import shape
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.transforms import Bbox
+import shapely
+
+# Rings below this vertex count are drawn as-is; simplification only pays
+# for itself on genuinely dense outlines
+_SIMPLIFY_MIN_VERTS = 64
+
+# Per-point value labels are only legible (and affordable - one Text
+# artist each) up to this many sampled points; beyond it the values are
+# shown as a colormap instead
+_ANNOTATE_MAX = 500
+
+
+def _decimate_rings(rings, tol):
+    """
+    Drop sub-pixel vertices from dense rings before they reach the canvas.
+
+    Rasterized at the output dpi, vertices closer together than about half
+    a pixel are invisible, so Douglas-Peucker at that tolerance cuts draw
+    time without changing the rendered image. Short rings pass through.
+    """
+    if tol <= 0:
+        return rings
+    return [
+        shapely.get_coordinates(shapely.simplify(shapely.linestrings(v), tol))
+        if len(v) > _SIMPLIFY_MIN_VERTS else v
+        for v in rings
+    ]
+
+# One Figure/Axes pair shared by every plot_features call: subplot setup
+# and teardown are a fixed cost per figure, so repeated plots reuse the
+# axes (with its static aspect/grid/labels) and only swap the artists
+_FIG_CACHE = []
+
+
+def _plot_context():
+    if not _FIG_CACHE:
+        # Initialize a square figure to better represent maps
+        fig, ax = plt.subplots(figsize=(10, 10))
+        # Important: Set aspect ratio to 'equal' so the map doesn't look stretched
+        ax.set_aspect('equal')
+        # Add grid lines for easier distance estimation
+        ax.grid(True, linestyle='--', alpha=0.5)
+        # Add axis labels with unit information
+        ax.set_xlabel("X Coordinates (Meters EPSG:3857)", fontsize=10)
+        ax.set_ylabel("Y Coordinates (Meters EPSG:3857)", fontsize=10)
+        _FIG_CACHE.append((fig, ax))
+    return _FIG_CACHE[0]
+
 
 def plot_features(feature_collection, title="GeoJSON Plot", output_path="out/plot.png"):
-    # Initialize a square figure to better represent maps
-    fig, ax = plt.subplots(figsize=(10, 10))
+    fig, ax = _plot_context()
     ax.set_title(title, fontsize=14, fontweight='bold')
-    
-    # Iterate and plot each feature in the collection
+
+    # Forget the previous plot's data extent so autoscale fits this one
+    ax.dataLim.set_points(Bbox.null().get_points())
+    ax.ignore_existing_data_limits = True
+    n_collections = len(ax.collections)
+    n_texts = len(ax.texts)
+    colorbars = []
+
+    # Polygon rings are collected per style class and drawn as one
+    # collection each after the loop: a single batched draw call instead
+    # of one plot/fill artist pair per feature
+    default_verts = []
+    original_verts = []
+    envelope_verts = []
+
+    # Points batch the same way: one scatter (a single PathCollection) per
+    # style class instead of a Line2D artist per point
+    centroid_xy = []
+    sampled_xy = []
+    sampled_vals = []
+    standard_xy = []
+
+    # Iterate and plot each feature in the collection. The raw GeoJSON
+    # coordinates are already what the collections consume, so no Shapely
+    # object is built per feature on the way to the canvas.
     for feature in feature_collection["features"]:
-        # Convert GeoJSON feature to Shapely geometry for easy coordinate extraction
-        geom = shape(feature["geometry"])
-        geom_type = geom.geom_type
+        geometry = feature["geometry"]
+        geom_type = geometry["type"]
         # Extract properties to check for custom flags
         props = feature.get("properties", {})
         feat_type = props.get("type", "")
@@ -18,48 +95,91 @@ def plot_features(feature_collection, title="GeoJSON Plot", output_path="out/plo
         
         # Styling logic based on geometry type and properties
         if geom_type == 'Point':
+            x, y = geometry["coordinates"][:2]
             if feat_type == "Centroid":
-                # Centroids: Green dots
-                ax.plot(geom.x, geom.y, 'go', markersize=8, label='Centroid', zorder=10)
+                centroid_xy.append((x, y))
             elif viz_type == "SampledPoint":
-                # [NEW] Raster Sampled Points: Blue dots with text value
-                ax.plot(geom.x, geom.y, 'bo', markersize=6, label='Sampled Value', zorder=6)
-                val = props.get("raster_value", 0)
-                # Annotate the value next to the point
-                ax.text(geom.x + 20, geom.y + 20, f"{val:.1f}", fontsize=9, color='blue', zorder=7)
+                sampled_xy.append((x, y))
+                sampled_vals.append(props.get("raster_value", 0))
             else:
-                # Standard Points: Red dots
-                ax.plot(geom.x, geom.y, 'ro', markersize=6, label='Point', zorder=5)
-            
+                standard_xy.append((x, y))
+
         elif geom_type == 'Polygon':
-            x, y = geom.exterior.xy
-            
+            # Exterior ring only, same as the old geom.exterior path
+            verts = np.asarray(geometry["coordinates"][0])
+
             if feat_type == "Original":
-                # Original Polygon: Black dashed line
-                ax.plot(x, y, 'k--', linewidth=1.5, label='Original Polygon')
-            
+                original_verts.append(verts)
             elif feat_type == "Envelope":
-                # Envelope: Orange dash-dot line
-                ax.plot(x, y, color='orange', linestyle='-.', linewidth=2, label='Envelope', zorder=4)
-                
+                envelope_verts.append(verts)
             else:
-                # Default (Buffer/Clip): Blue outline and fill
-                ax.plot(x, y, color='#6699cc', alpha=0.8, linewidth=2)
-                ax.fill(x, y, color='#6699cc', alpha=0.3)
-
-    # Important: Set aspect ratio to 'equal' so the map doesn't look stretched
-    ax.set_aspect('equal')
-    
-    # Add grid lines for easier distance estimation
-    ax.grid(True, linestyle='--', alpha=0.5) 
-    
-    # Add axis labels with unit information
-    ax.set_xlabel("X Coordinates (Meters EPSG:3857)", fontsize=10)
-    ax.set_ylabel("Y Coordinates (Meters EPSG:3857)", fontsize=10)
-    
+                default_verts.append(verts)
+
+    # Pixel-sized simplification tolerance: half a pixel at the output
+    # resolution (figsize 10in x 150 dpi), derived from the data extent
+    all_rings = default_verts + original_verts + envelope_verts
+    if all_rings:
+        xs = np.concatenate([v[:, 0] for v in all_rings])
+        tol = (xs.max() - xs.min()) / (10 * 150) * 0.5
+        default_verts = _decimate_rings(default_verts, tol)
+        original_verts = _decimate_rings(original_verts, tol)
+        envelope_verts = _decimate_rings(envelope_verts, tol)
+
+    # Batched polygon draws: one artist per style class
+    if default_verts:
+        # Default (Buffer/Clip): Blue outline and fill
+        ax.add_collection(PolyCollection(
+            default_verts,
+            facecolors=to_rgba('#6699cc', 0.3),
+            edgecolors=to_rgba('#6699cc', 0.8),
+            linewidths=2,
+        ))
+    if original_verts:
+        # Original Polygon: Black dashed line
+        ax.add_collection(LineCollection(
+            original_verts, colors='k', linestyles='--', linewidths=1.5,
+            label='Original Polygon',
+        ))
+    if envelope_verts:
+        # Envelope: Orange dash-dot line
+        ax.add_collection(LineCollection(
+            envelope_verts, colors='orange', linestyles='-.', linewidths=2,
+            label='Envelope', zorder=4,
+        ))
+    # Batched point draws (marker sizes: scatter s is in points^2)
+    if standard_xy:
+        # Standard Points: Red dots
+        sx, sy = np.array(standard_xy).T
+        ax.scatter(sx, sy, c='r', s=36, label='Point', zorder=5)
+    if sampled_xy:
+        # [NEW] Raster Sampled Points
+        sx, sy = np.array(sampled_xy).T
+        if len(sampled_xy) < _ANNOTATE_MAX:
+            # Few points: blue dots, value written next to each one
+            ax.scatter(sx, sy, c='b', s=36, label='Sampled Value', zorder=6)
+            for x, y, val in zip(sx, sy, sampled_vals):
+                ax.text(x + 20, y + 20, f"{val:.1f}", fontsize=9, color='blue', zorder=7)
+        else:
+            # Dense clouds: one Text artist per point would swamp the draw,
+            # so encode the value in a colormap instead of labels
+            sc = ax.scatter(sx, sy, c=np.asarray(sampled_vals, dtype=np.float64),
+                            cmap='viridis', s=36, label='Sampled Value', zorder=6)
+            colorbars.append(fig.colorbar(sc, ax=ax, label='raster_value'))
+    if centroid_xy:
+        # Centroids: Green dots
+        cx, cy = np.array(centroid_xy).T
+        ax.scatter(cx, cy, c='g', s=64, label='Centroid', zorder=10)
+
+    ax.autoscale(enable=True)
+    ax.autoscale_view()
+
     # Save the figure to disk
-    plt.savefig(output_path, dpi=150)
-    
-    # Close the plot to free up memory
-    plt.close()
+    fig.savefig(output_path, dpi=150)
+
+    # Strip only this call's artists so the cached axes comes back clean
+    # (static title/grid/labels stay in place for the next plot)
+    for cb in colorbars:
+        cb.remove()
+    for artist in list(ax.collections[n_collections:]) + list(ax.texts[n_texts:]):
+        artist.remove()
     print(f" -> Visualization image saved to: {output_path}")
\ No newline at end of file
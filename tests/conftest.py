@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fast_gdal(monkeypatch):
+    """
+    Trim GDAL's small-file overhead for the raster round-trip tests:
+    no .aux.xml sidecar writes, and scratch files on tmpfs when the
+    platform has one. Harmless for tests that never touch GDAL.
+    """
+    monkeypatch.setenv("GDAL_PAM_ENABLED", "NO")
+    if os.path.isdir("/dev/shm"):
+        monkeypatch.setenv("CPL_TMPDIR", "/dev/shm")